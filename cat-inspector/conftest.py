@@ -0,0 +1,7 @@
+"""
+conftest.py
+───────────
+Root-level pytest config. Its presence makes pytest put cat-inspector/ on
+sys.path once at collection, so tests import context_engine, pipeline and
+schemas directly without touching sys.path themselves.
+"""
@@ -15,11 +15,20 @@ This is the last line of defense before the output leaves the pipeline.
 
 from __future__ import annotations
 
+import functools
 import json
 import re
 from dataclasses import dataclass
 from typing import Optional
 
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from schemas.inspection_schema import (
     InspectionOutput,
     ConfidenceScoring,
@@ -33,6 +42,26 @@ from schemas.context_schema import NormalizedAdapterContext
 from context_engine.weight_calculator import WeightVector
 
 
+# Built once at import; validate_python/validate_json reuse the compiled core validator
+INSPECTION_ADAPTER: TypeAdapter[InspectionOutput] = TypeAdapter(InspectionOutput)
+
+
+# Compiled once; _extract_json runs on every model response
+_FENCE_RE  = re.compile(r"```(?:json)?\s*")
+_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def _json_loads(text: str):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type
+    return orjson.loads(text) if ORJSON_AVAILABLE else json.loads(text)
+
+
+@functools.lru_cache(maxsize=64)
+def _anomaly_ids(count: int) -> tuple[str, ...]:
+    """Expected sequential ids A001..Annn for `count` anomalies."""
+    return tuple(f"A{i:03d}" for i in range(1, count + 1))
+
+
 @dataclass
 class ValidationResult:
     success:       bool
@@ -60,19 +89,43 @@ class SchemaValidator:
             weights:  The WeightVector used for this inspection (for recalculation)
         """
         errors: list[str] = []
-        corrections: list[str] = []
 
         # ── Phase 1: Extract JSON ─────────────────────────────────────────────
         raw_dict = self._extract_json(raw_text, errors)
         if raw_dict is None:
-            return ValidationResult(False, None, None, errors, corrections)
+            return ValidationResult(False, None, None, errors, [])
+
+        return self._validate_parsed(raw_dict, weights, adapter_context, errors)
+
+    def validate_obj(
+        self,
+        raw_dict: dict,
+        weights: WeightVector,
+        adapter_context: Optional[NormalizedAdapterContext] = None,
+    ) -> ValidationResult:
+        """
+        Same as validate() for output that is already a parsed dict
+        (e.g. inspect_image's output_json) — skips the JSON extraction pass.
+        Use validate() for raw model text. Auto-corrections are applied to
+        raw_dict in place.
+        """
+        return self._validate_parsed(raw_dict, weights, adapter_context, [])
+
+    def _validate_parsed(
+        self,
+        raw_dict: dict,
+        weights: WeightVector,
+        adapter_context: Optional[NormalizedAdapterContext],
+        errors: list[str],
+    ) -> ValidationResult:
+        corrections: list[str] = []
 
         # ── Phase 2: Auto-correct calculable fields ───────────────────────────
         raw_dict = self._autocorrect(raw_dict, weights, corrections)
 
         # ── Phase 3: Pydantic parse ───────────────────────────────────────────
         try:
-            output = InspectionOutput.model_validate(raw_dict)
+            output = INSPECTION_ADAPTER.validate_python(raw_dict)
             output = self.enforce_global_safety_stops(output)
             output = self.enforce_adapter_stop_on_asap(output, adapter_context)
             output = self.enforce_adapter_conflict_review(output, adapter_context)
@@ -88,20 +141,29 @@ class SchemaValidator:
         Attempts to extract a JSON object from model output.
         Handles: clean JSON, markdown-fenced JSON, JSON with preamble.
         """
-        # Strip markdown fences
-        cleaned = re.sub(r"```(?:json)?\s*", "", text).replace("```", "").strip()
+        # Fast path: clean JSON, or a single fenced block around it
+        stripped = text.strip()
+        if stripped.startswith("```"):
+            stripped = stripped.removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+        try:
+            return _json_loads(stripped)
+        except json.JSONDecodeError:
+            pass
+
+        # Strip markdown fences anywhere (e.g. after a preamble)
+        cleaned = _FENCE_RE.sub("", text).replace("```", "").strip()
 
         # Try direct parse
         try:
-            return json.loads(cleaned)
+            return _json_loads(cleaned)
         except json.JSONDecodeError:
             pass
 
         # Try extracting first {...} block
-        match = re.search(r"\{.*\}", cleaned, re.DOTALL)
+        match = _OBJECT_RE.search(cleaned)
         if match:
             try:
-                return json.loads(match.group())
+                return _json_loads(match.group())
             except json.JSONDecodeError as e:
                 errors.append(f"JSON extraction failed: {e}")
                 return None
@@ -164,8 +226,11 @@ class SchemaValidator:
 
     def _fix_anomaly_ids(self, d: dict, corrections: list[str]) -> dict:
         anomalies = d.get("anomalies", [])
-        for i, a in enumerate(anomalies):
-            expected_id = f"A{i+1:03d}"
+        expected = _anomaly_ids(len(anomalies))
+        # Common case: the model numbered them correctly — one list compare
+        if tuple(a.get("anomaly_id") for a in anomalies) == expected:
+            return d
+        for i, (a, expected_id) in enumerate(zip(anomalies, expected)):
             if a.get("anomaly_id") != expected_id:
                 a["anomaly_id"] = expected_id
                 corrections.append(f"anomaly[{i}].anomaly_id set to {expected_id}")
@@ -94,6 +94,10 @@ KEYWORD_MAP: dict[str, str] = {
     "pin":          "undercarriage",
 }
 
+# Precomputed once at import; _resolve / list_categories run per request
+_TOKEN_SPLIT = re.compile(r"[\s_\-/]+")
+_ROUTE_KEYS: tuple[str, ...] = tuple(k for k in ROUTES if k != "auto")
+
 
 @dataclass
 class RouteResult:
@@ -177,7 +181,7 @@ class SubsectionRouter:
             )
 
         # 2. Fuzzy keyword match
-        tokens = re.split(r"[\s_\-/]+", normalized)
+        tokens = _TOKEN_SPLIT.split(normalized)
         for token in tokens:
             if token in KEYWORD_MAP:
                 cat = KEYWORD_MAP[token]
@@ -197,7 +201,7 @@ class SubsectionRouter:
         )
 
     def list_categories(self) -> list[str]:
-        return [k for k in ROUTES if k != "auto"]
+        return list(_ROUTE_KEYS)
 
 
 class AutoDetectRequired(Exception):
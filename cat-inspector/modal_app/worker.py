@@ -34,6 +34,7 @@ from context_engine.context_builder import ContextBuilder
 from context_engine.schema_validator import SchemaValidator, ValidationResult
 from context_engine.subsection_router import AutoDetectRequired
 from context_engine.weight_calculator import WeightCalculator
+from schemas.inspection_schema import InspectionOutput
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -119,6 +120,17 @@ def classify_component(image_bytes: bytes) -> str:
 # MAIN INSPECTION WORKER
 # ─────────────────────────────────────────────────────────────────────────────
 
+def _ensure_input_visible(image_path: str) -> None:
+    """
+    Reloads the inputs volume only when image_path isn't visible yet.
+    Uploads are content-addressed and land in one batch commit, so the first
+    miss after a new batch pulls in every file of that batch; later calls on
+    the same container find their files and skip the reload.
+    """
+    if not Path(image_path).exists():
+        input_volume.reload()
+
+
 @app.function(
     image=modal_image,
     secrets=[anthropic_secret],
@@ -143,7 +155,8 @@ def inspect_image(
         image_path:         Path to image (on Modal volume or local for testing)
         component_category: Category key or "auto" for classifier-assisted routing
         weight_profile:     Named weight profile from WeightCalculator
-        image_bytes:        Raw image bytes (overrides disk read if provided)
+        image_bytes:        Raw image bytes (overrides disk read if provided).
+                            Omit to read image_path from the inputs volume.
 
     Returns:
         dict with keys: success, output_json, validation_corrections, run_metadata
@@ -153,6 +166,9 @@ def inspect_image(
     run_start = datetime.now(timezone.utc)
     client    = anthropic.Anthropic(api_key=os.environ["ANTHROPIC_API_KEY"])
 
+    if image_bytes is None:
+        _ensure_input_visible(image_path)
+
     # ── 1. Auto-detect category if needed ─────────────────────────────────────
     if component_category == "auto":
         raw_bytes = image_bytes or Path(image_path).read_bytes()
@@ -208,9 +224,25 @@ def inspect_image(
         }
 
     # ── 5. Write to output volume ──────────────────────────────────────────────
+    # The bytes are checked against the exported wire schema before they land
+    # on the volume, so readers of /outputs can rely on the contract as-is
+    body = result.output.to_json_bytes()
+    try:
+        InspectionOutput.validate_wire(body)
+    except ValueError as e:
+        print(f"[worker] Wire contract check FAILED: {e}")
+        run_meta["validation_success"] = False
+        run_meta["errors"] = [*result.errors, f"wire contract: {e}"]
+        return {
+            "success":    False,
+            "output_json": None,
+            "raw_output":  raw_text,
+            "run_metadata": run_meta,
+        }
+
     output_json = result.output.model_dump()
     output_path = Path(f"/outputs/{Path(image_path).stem}_{run_start.strftime('%Y%m%dT%H%M%S')}.json")
-    output_path.write_text(json.dumps(output_json, indent=2))
+    output_path.write_bytes(body)
     output_volume.commit()
     print(f"[worker] Output written: {output_path}")
 
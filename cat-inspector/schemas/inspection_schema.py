@@ -21,9 +21,25 @@ canonical structure with weighted confidence scoring appended.
 """
 
 from __future__ import annotations
+import functools
+import json
+from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
-from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Any, Optional
+from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
+from pydantic.dataclasses import dataclass as validated_dataclass
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    FASTJSONSCHEMA_AVAILABLE = False
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -47,6 +63,34 @@ class ConfidenceLevel(str, Enum):
     LOW    = "Low"            # 0.50–0.69 — suspicious, closer inspection
 
 
+UnitFloat = Annotated[float, Field(ge=0.0, le=1.0)]
+
+# Order of the SoA tuples in ConfidenceScoring
+DIMENSIONS: tuple[str, str, str, str] = (
+    "visual_clarity",
+    "severity_match",
+    "context_alignment",
+    "field_history",
+)
+
+
+def _dim_value(name: str, dim: Any, key: str) -> float:
+    """
+    Reads weight/score from a wire dict or a WeightedDimension, raising a
+    ValueError that names the dimension when it is missing or out of range.
+    """
+    value = dim.get(key) if isinstance(dim, dict) else getattr(dim, key, None)
+    if value is None:
+        raise ValueError(f"{name}.{key} missing")
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name}.{key} must be a number, got {value!r}") from None
+    if not 0.0 <= value <= 1.0:
+        raise ValueError(f"{name}.{key} must be within [0, 1], got {value}")
+    return value
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ANOMALY — core finding unit
 # ─────────────────────────────────────────────────────────────────────────────
@@ -148,63 +192,83 @@ class Anomaly(BaseModel):
 # WEIGHT VECTOR — injected by context_engine, scored by inference model
 # ─────────────────────────────────────────────────────────────────────────────
 
-class WeightedDimension(BaseModel):
+@dataclass(frozen=True, slots=True)
+class WeightedDimension:
     """One confidence dimension with its pre-set weight and model-assigned score."""
-    weight:   float = Field(..., ge=0.0, le=1.0, description="Pre-configured weight (sums to 1.0 across all dimensions)")
-    score:    float = Field(..., ge=0.0, le=1.0, description="Model-assigned score for this dimension")
-    weighted: float = Field(..., ge=0.0, le=1.0, description="weight × score (calculated)")
+    weight:   float  # Pre-configured weight (sums to 1.0 across all dimensions)
+    score:    float  # Model-assigned score for this dimension
+    weighted: float  # weight × score (calculated)
 
-    @model_validator(mode="after")
-    def enforce_weighted(self) -> "WeightedDimension":
-        expected = round(self.weight * self.score, 4)
-        self.weighted = expected
-        return self
+
+# Pydantic dataclasses validate on direct construction too, and revalidate
+# instances nested in InspectionOutput, so field constraints always hold
+_RECORD_CONFIG = ConfigDict(revalidate_instances="always")
 
 
-class TechnicianVerification(BaseModel):
+@validated_dataclass(frozen=True, slots=True, kw_only=True, config=_RECORD_CONFIG)
+class TechnicianVerification:
     """
     Technician sign-off layer. Injected into InspectionOutput
     after SchemaValidator completes. Pipeline is halted at
     PENDING_VERIFICATION until this model is fully populated.
     """
-    technician_id: Optional[str] = Field(
-        default=None,
+    technician_id: Annotated[Optional[str], Field(
         description="Identifier of reviewing technician. Required before sign-off."
-    )
-    technician_sign_off: Optional[bool] = Field(
-        default=None,
+    )] = None
+    technician_sign_off: Annotated[Optional[bool], Field(
         description=(
             "True = technician approves report. "
             "False = report flagged for supervisor review. "
             "None = awaiting verification."
         )
-    )
-    verification_timestamp: Optional[str] = Field(
-        default=None,
+    )] = None
+    verification_timestamp: Annotated[Optional[str], Field(
         description="ISO 8601. System-set when sign-off written. Never accept as input."
-    )
-    operational_status_override: Optional[OperationalStatus] = Field(
-        default=None,
+    )] = None
+    operational_status_override: Annotated[Optional[OperationalStatus], Field(
         description=(
             "Technician override of final operational_status. "
             "Cannot override STOP to GO if unreviewed Critical anomalies exist. "
             "None = use SchemaValidator result."
         )
-    )
-    verification_notes: Optional[str] = Field(
-        default=None,
+    )] = None
+    verification_notes: Annotated[Optional[str], Field(
         max_length=1000,
         description="Overall technician comments on the inspection report."
-    )
+    )] = None
 
-    @model_validator(mode="after")
-    def enforce_sign_off_requires_id(self) -> "TechnicianVerification":
+    def __post_init__(self) -> None:
+        # enforce_sign_off_requires_id
         if self.technician_sign_off is True:
             if not self.technician_id or str(self.technician_id).strip() == "":
                 raise ValueError(
                     "technician_id is required before technician_sign_off can be True"
                 )
-        return self
+
+
+def _dimension_input_schema(schema: dict[str, Any]) -> None:
+    """
+    Advertises the per-dimension wire objects instead of the internal
+    scores/weights tuples. Excluded fields only appear in validation mode,
+    so the serialization schema (computed fields) is left as generated.
+    """
+    props = schema.get("properties", {})
+    if "scores" not in props:
+        return
+    del props["scores"], props["weights"]
+    dimension = {
+        "type": "object",
+        "properties": {
+            "weight":   {"type": "number", "minimum": 0.0, "maximum": 1.0},
+            "score":    {"type": "number", "minimum": 0.0, "maximum": 1.0},
+            "weighted": {"type": "number"},
+        },
+        "required": ["weight", "score"],
+    }
+    props.update({k: dict(dimension, title=k.replace("_", " ").title()) for k in DIMENSIONS})
+    schema["required"] = [
+        *DIMENSIONS, *(k for k in schema.get("required", []) if k not in ("scores", "weights"))
+    ]
 
 
 class ConfidenceScoring(BaseModel):
@@ -216,31 +280,71 @@ class ConfidenceScoring(BaseModel):
       severity_match   — How certain the severity classification is
       context_alignment — How well the finding aligns with the subsection criteria
       field_history    — Match with known CAT field failure patterns
+
+    Stored as two parallel 4-tuples (scores, weights) ordered as DIMENSIONS.
+    The per-dimension {weight, score, weighted} objects of the JSON contract
+    are accepted on input and re-emitted as computed fields on output.
     """
-    visual_clarity:    WeightedDimension
-    severity_match:    WeightedDimension
-    context_alignment: WeightedDimension
-    field_history:     WeightedDimension
+    model_config = ConfigDict(json_schema_extra=_dimension_input_schema)
+
+    scores:  tuple[UnitFloat, UnitFloat, UnitFloat, UnitFloat] = Field(..., exclude=True)
+    weights: tuple[UnitFloat, UnitFloat, UnitFloat, UnitFloat] = Field(..., exclude=True)
 
     overall_confidence: float          = Field(..., ge=0.0, le=1.0)
     confidence_level:   ConfidenceLevel
 
-    @model_validator(mode="after")
-    def compute_overall(self) -> "ConfidenceScoring":
-        total = (
-            self.visual_clarity.weighted
-            + self.severity_match.weighted
-            + self.context_alignment.weighted
-            + self.field_history.weighted
-        )
-        self.overall_confidence = round(min(total, 1.0), 4)
-        if self.overall_confidence >= 0.90:
-            self.confidence_level = ConfidenceLevel.HIGH
-        elif self.overall_confidence >= 0.70:
-            self.confidence_level = ConfidenceLevel.MEDIUM
+    @model_validator(mode="before")
+    @classmethod
+    def compute_overall(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        if "scores" not in data:
+            missing = [k for k in DIMENSIONS if k not in data]
+            if missing:
+                raise ValueError(f"{', '.join(missing)} missing")
+            dims = {k: data.pop(k) for k in DIMENSIONS}
+            data["scores"]  = tuple(_dim_value(k, d, "score") for k, d in dims.items())
+            data["weights"] = tuple(_dim_value(k, d, "weight") for k, d in dims.items())
+        try:
+            scores  = tuple(float(x) for x in data["scores"])
+            weights = tuple(float(x) for x in data["weights"])
+        except (KeyError, TypeError, ValueError):
+            return data  # let field validation report the malformed input
+        total = sum(round(w * s, 4) for w, s in zip(weights, scores))
+        overall = round(min(total, 1.0), 4)
+        data["overall_confidence"] = overall
+        if overall >= 0.90:
+            data["confidence_level"] = ConfidenceLevel.HIGH
+        elif overall >= 0.70:
+            data["confidence_level"] = ConfidenceLevel.MEDIUM
         else:
-            self.confidence_level = ConfidenceLevel.LOW
-        return self
+            data["confidence_level"] = ConfidenceLevel.LOW
+        return data
+
+    def _dimension(self, i: int) -> WeightedDimension:
+        w, s = self.weights[i], self.scores[i]
+        return WeightedDimension(weight=w, score=s, weighted=round(w * s, 4))
+
+    @computed_field
+    @property
+    def visual_clarity(self) -> WeightedDimension:
+        return self._dimension(0)
+
+    @computed_field
+    @property
+    def severity_match(self) -> WeightedDimension:
+        return self._dimension(1)
+
+    @computed_field
+    @property
+    def context_alignment(self) -> WeightedDimension:
+        return self._dimension(2)
+
+    @computed_field
+    @property
+    def field_history(self) -> WeightedDimension:
+        return self._dimension(3)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -256,24 +360,35 @@ class InspectionSummary(BaseModel):
     priority_action:             str
     overall_equipment_condition: str
 
-    @model_validator(mode="after")
-    def derive_status(self) -> "InspectionSummary":
-        if getattr(self, "operational_status", None) == OperationalStatus.PENDING_VERIFICATION:
-            return self
-        if self.critical_count > 0:
-            self.operational_status = OperationalStatus.STOP
-        elif self.moderate_count > 0:
-            self.operational_status = OperationalStatus.CAUTION
+    @model_validator(mode="before")
+    @classmethod
+    def derive_status(cls, data: Any) -> Any:
+        # Derived on the raw dict so no post-construction reassignment is needed
+        if not isinstance(data, dict):
+            return data
+        if data.get("operational_status") == OperationalStatus.PENDING_VERIFICATION:
+            return data
+        try:
+            crit = int(data.get("critical_count", 0))
+            mod  = int(data.get("moderate_count", 0))
+        except (TypeError, ValueError):
+            return data  # let field validation report the malformed counts
+        data = dict(data)
+        if crit > 0:
+            data["operational_status"] = OperationalStatus.STOP
+        elif mod > 0:
+            data["operational_status"] = OperationalStatus.CAUTION
         else:
-            self.operational_status = OperationalStatus.GO
-        return self
+            data["operational_status"] = OperationalStatus.GO
+        return data
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # METADATA — inspection run metadata
 # ─────────────────────────────────────────────────────────────────────────────
 
-class InspectionMetadata(BaseModel):
+@validated_dataclass(frozen=True, slots=True, kw_only=True, config=_RECORD_CONFIG)
+class InspectionMetadata:
     equipment_type:      str = "Caterpillar Heavy Equipment"
     component_category:  str
     inspection_timestamp: str                  # ISO 8601
@@ -310,60 +425,108 @@ class InspectionOutput(BaseModel):
     def to_json(self, indent: int = 2) -> str:
         return self.model_dump_json(indent=indent, exclude_none=True)
 
+    def to_json_bytes(self) -> bytes:
+        """Compact UTF-8 JSON for volume writes / HTTP bodies. Use to_json for humans."""
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self.model_dump(mode="json", exclude_none=True))
+        return self.model_dump_json(exclude_none=True).encode("utf-8")
+
+    @classmethod
+    def validate_wire(cls, raw: bytes | str) -> dict:
+        """
+        Structural check of a wire payload against the precompiled JSON
+        Schema. Returns the parsed dict without building an InspectionOutput
+        — use for logging/forwarding paths that never touch the fields.
+        Derived-field auto-correction still requires model_validate.
+        Raises ValueError if the payload is not valid JSON or off-contract.
+        """
+        data = orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+        if _FAST_VALIDATOR is not None:
+            _FAST_VALIDATOR(data)
+        else:
+            cls.model_validate(data)
+        return data
+
     @model_validator(mode="after")
     def enforce_technician_constraints(self) -> "InspectionOutput":
         # Rule 1: STOP cannot be overridden to GO if any Critical anomaly has technician_confirmed = None or True
         # without a severity override to Moderate or Normal
-        if self.technician_verification is not None:
-            ov = getattr(self.technician_verification, "operational_status_override", None)
-            if ov == OperationalStatus.GO:
-                for anomaly in self.anomalies:
-                    if anomaly.severity == Severity.CRITICAL:
-                        if anomaly.technician_confirmed is None or anomaly.technician_confirmed is True:
-                            if anomaly.technician_severity_override not in (Severity.MODERATE, Severity.NORMAL):
-                                raise ValueError("Cannot override status to GO with unmitigated Critical anomalies")
+        tv = self.technician_verification
+        if tv is None:
+            return self
+        # == rather than `is`: both are str enums, so a plain "GO" / "Critical"
+        # (e.g. from model_construct) must still trip the check
+        if tv.operational_status_override == OperationalStatus.GO:
+            for anomaly in self.anomalies:
+                if anomaly.severity == Severity.CRITICAL:
+                    if anomaly.technician_confirmed is None or anomaly.technician_confirmed is True:
+                        if anomaly.technician_severity_override not in (Severity.MODERATE, Severity.NORMAL):
+                            raise ValueError("Cannot override status to GO with unmitigated Critical anomalies")
         return self
 
     @classmethod
     def example_pass(cls) -> "InspectionOutput":
-        """Mirrors PassPrompt2 structure for unit testing."""
-        return cls(
-            inspection_metadata=InspectionMetadata(
-                component_category="tires_rims",
-                inspection_timestamp="2025-02-28T12:00:00Z",
-                subsection_prompt="prompts/subsections/tires_rims.md",
-            ),
-            confidence_scoring=ConfidenceScoring(
-                visual_clarity=WeightedDimension(weight=0.35, score=0.95, weighted=0.3325),
-                severity_match=WeightedDimension(weight=0.30, score=0.92, weighted=0.276),
-                context_alignment=WeightedDimension(weight=0.20, score=0.90, weighted=0.18),
-                field_history=WeightedDimension(weight=0.15, score=0.88, weighted=0.132),
-                overall_confidence=0.9205,
-                confidence_level=ConfidenceLevel.HIGH,
+        """Mirrors PassPrompt2 structure for unit testing.
+
+        Validated once; each call returns a deep copy callers may mutate.
+        """
+        return _example_pass().model_copy(deep=True)
+
+
+@functools.lru_cache(maxsize=1)
+def _example_pass() -> InspectionOutput:
+    return InspectionOutput(
+        inspection_metadata=InspectionMetadata(
+            component_category="tires_rims",
+            inspection_timestamp="2025-02-28T12:00:00Z",
+            subsection_prompt="prompts/subsections/tires_rims.md",
+        ),
+        confidence_scoring=ConfidenceScoring(
+            scores=(0.95, 0.92, 0.90, 0.88),
+            weights=(0.35, 0.30, 0.20, 0.15),
+            overall_confidence=0.9205,
+            confidence_level=ConfidenceLevel.HIGH,
+        ),
+        anomalies=[
+            Anomaly(
+                anomaly_id="A001",
+                component_location="Front Left Rim",
+                component_type="Rim",
+                issue="Severe Rim Corrosion",
+                condition_description="Extensive rust and pitting on rim structure affecting integrity and mounting surfaces.",
+                severity=Severity.CRITICAL,
+                safety_impact_assessment="Critical — structural failure risk and air seal compromise.",
+                visibility_impact="No direct visibility impact.",
+                operational_impact="Wheel separation hazard; equipment must not operate.",
+                recommended_action="Immediate rim replacement.",
+                anomaly_confidence=0.96,
+                detection_basis="Rust discoloration and visible pitting across full rim flange.",
             ),
-            anomalies=[
-                Anomaly(
-                    anomaly_id="A001",
-                    component_location="Front Left Rim",
-                    component_type="Rim",
-                    issue="Severe Rim Corrosion",
-                    condition_description="Extensive rust and pitting on rim structure affecting integrity and mounting surfaces.",
-                    severity=Severity.CRITICAL,
-                    safety_impact_assessment="Critical — structural failure risk and air seal compromise.",
-                    visibility_impact="No direct visibility impact.",
-                    operational_impact="Wheel separation hazard; equipment must not operate.",
-                    recommended_action="Immediate rim replacement.",
-                    anomaly_confidence=0.96,
-                    detection_basis="Rust discoloration and visible pitting across full rim flange.",
-                ),
-            ],
-            summary=InspectionSummary(
-                critical_count=1,
-                moderate_count=1,
-                normal_count=0,
-                wheel_position="Front left",
-                operational_status=OperationalStatus.STOP,
-                priority_action="Replace corroded rim immediately. Inspect all wheel hardware.",
-                overall_equipment_condition="Critical wheel condition. Equipment grounded pending repair.",
-            ),
-        )
+        ],
+        summary=InspectionSummary(
+            critical_count=1,
+            moderate_count=1,
+            normal_count=0,
+            wheel_position="Front left",
+            operational_status=OperationalStatus.STOP,
+            priority_action="Replace corroded rim immediately. Inspect all wheel hardware.",
+            overall_equipment_condition="Critical wheel condition. Equipment grounded pending repair.",
+        ),
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# JSON SCHEMA — generated once at import; use this instead of model_json_schema()
+# ─────────────────────────────────────────────────────────────────────────────
+
+InspectionOutput.model_rebuild()
+
+# Serialization mode describes the wire contract as emitted, computed
+# dimension fields included; validation mode describes accepted input.
+INSPECTION_OUTPUT_JSON_SCHEMA: dict = InspectionOutput.model_json_schema(mode="serialization")
+
+# Compiled once for InspectionOutput.validate_wire
+_FAST_VALIDATOR = (
+    fastjsonschema.compile(INSPECTION_OUTPUT_JSON_SCHEMA, use_default=False)
+    if FASTJSONSCHEMA_AVAILABLE else None
+)
@@ -10,19 +10,33 @@ Run once to:
   4. Print Antigravity IDE setup instructions
 
 Usage:
-  python scripts/deploy.py [--dry-run] [--modal-only] [--validate-only]
+  python -m scripts.deploy [--dry-run] [--modal-only] [--validate-only]
 """
 
 import argparse
+import io
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional, TextIO
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 ROOT = Path(__file__).parent.parent
 
 
-def validate_prompts() -> bool:
-    print("\n[1/4] Validating subsection prompts...")
+def _emit(lines: list[str], out: Optional[TextIO] = None) -> None:
+    """Write a step's log lines in one call instead of one print per line."""
+    (out or sys.stdout).write("\n".join(lines) + "\n")
+
+
+def validate_prompts(out: Optional[TextIO] = None) -> bool:
+    lines = ["\n[1/4] Validating subsection prompts..."]
     REQUIRED = [
         "prompts/system/base_inspector.txt",
         "prompts/subsections/tires_rims.md",
@@ -33,65 +47,81 @@ def validate_prompts() -> bool:
         "prompts/subsections/engine.md",
         "prompts/subsections/undercarriage.md",
     ]
+    existing = {p.relative_to(ROOT).as_posix() for p in (ROOT / "prompts").rglob("*")}
     all_ok = True
     for f in REQUIRED:
-        path = ROOT / f
-        if path.exists():
-            print(f"  ✅  {f}")
+        if f in existing:
+            lines.append(f"  ✅  {f}")
         else:
-            print(f"  ❌  MISSING: {f}")
+            lines.append(f"  ❌  MISSING: {f}")
             all_ok = False
+    _emit(lines, out)
     return all_ok
 
 
-def validate_schema() -> bool:
-    print("\n[2/4] Validating Pydantic schemas...")
+def validate_schema(out: Optional[TextIO] = None) -> bool:
+    lines = ["\n[2/4] Validating Pydantic schemas..."]
     try:
-        sys.path.insert(0, str(ROOT))
         from schemas.inspection_schema import InspectionOutput
         example = InspectionOutput.example_pass()
-        print(f"  ✅  InspectionOutput schema valid")
-        print(f"  ✅  Example PASS output: confidence={example.confidence_scoring.overall_confidence}")
+        lines.append(f"  ✅  InspectionOutput schema valid")
+        lines.append(f"  ✅  Example PASS output: confidence={example.confidence_scoring.overall_confidence}")
         return True
     except Exception as e:
-        print(f"  ❌  Schema validation failed: {e}")
+        lines.append(f"  ❌  Schema validation failed: {e}")
         return False
+    finally:
+        _emit(lines, out)
 
 
-def validate_weights() -> bool:
-    print("\n[3/4] Validating weight profiles...")
+def validate_weights(out: Optional[TextIO] = None) -> bool:
+    lines = ["\n[3/4] Validating weight profiles..."]
     try:
         from context_engine.weight_calculator import WeightCalculator
         wc = WeightCalculator()
-        for name, vec in wc.list_profiles().items():
-            total = sum(vec.values())
-            status = "✅" if abs(total - 1.0) < 0.001 else "❌"
-            print(f"  {status}  {name}: sum={total:.4f} | {vec}")
+        profiles = wc.list_profiles()
+        if NUMPY_AVAILABLE:
+            # One row per profile; a single reduction covers every profile
+            mat = np.array([list(v.values()) for v in profiles.values()], dtype=np.float64)
+            totals = mat.sum(axis=1)
+            ok = np.isclose(totals, 1.0, rtol=0.0, atol=1e-3)
+        else:
+            totals = [sum(v.values()) for v in profiles.values()]
+            ok = [abs(t - 1.0) < 0.001 for t in totals]
+        for (name, vec), total, good in zip(profiles.items(), totals, ok):
+            status = "✅" if good else "❌"
+            lines.append(f"  {status}  {name}: sum={total:.4f} | {vec}")
         return True
     except Exception as e:
-        print(f"  ❌  Weight validation failed: {e}")
+        lines.append(f"  ❌  Weight validation failed: {e}")
         return False
+    finally:
+        _emit(lines, out)
 
 
 def deploy_modal(dry_run: bool = False) -> bool:
     print("\n[4/4] Deploying Modal worker...")
     if dry_run:
-        print("  ⏭️  DRY RUN — skipping modal deploy")
-        print("  Run: modal deploy modal_app/worker.py")
+        _emit(["  ⏭️  DRY RUN — skipping modal deploy",
+               "  Run: modal deploy modal_app/worker.py"])
         return True
     try:
-        result = subprocess.run(
+        # Stream deploy output line by line instead of buffering it until exit
+        proc = subprocess.Popen(
             ["modal", "deploy", "modal_app/worker.py"],
             cwd=str(ROOT),
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
+            bufsize=1,
         )
-        if result.returncode == 0:
+        for line in proc.stdout:
+            print(line, end="", flush=True)
+        if proc.wait() == 0:
             print(f"  ✅  Modal deploy successful")
-            print(result.stdout)
             return True
         else:
-            print(f"  ❌  Modal deploy failed:\n{result.stderr}")
+            print(f"  ❌  Modal deploy failed (exit code {proc.returncode})")
             return False
     except FileNotFoundError:
         print("  ❌  'modal' CLI not found. Install: pip install modal && modal setup")
@@ -136,10 +166,15 @@ def main():
     parser.add_argument("--validate-only", action="store_true")
     args = parser.parse_args()
 
-    checks = []
-    checks.append(validate_prompts())
-    checks.append(validate_schema())
-    checks.append(validate_weights())
+    # Independent steps run in parallel; each logs to its own buffer which is
+    # printed in step order so console output stays deterministic.
+    steps = [validate_prompts, validate_schema, validate_weights]
+    buffers = [io.StringIO() for _ in steps]
+    with ThreadPoolExecutor(len(steps)) as pool:
+        futures = [pool.submit(step, buf) for step, buf in zip(steps, buffers)]
+        checks = [f.result() for f in futures]
+    sys.stdout.write("".join(buf.getvalue() for buf in buffers))
+    sys.stdout.flush()
 
     if not args.validate_only:
         checks.append(deploy_modal(dry_run=args.dry_run))
@@ -1,27 +1,192 @@
+import asyncio
+import functools
 import json
 import os
 import sys
+from dataclasses import dataclass
+from hashlib import blake2b
 from datetime import datetime, timezone
 from pathlib import Path
 
 import modal
 
-# Ensure the root directory is in the sys.path
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Run from cat-inspector/ as `python -m scripts.run_training` so the
+# context_engine package resolves from the working directory.
 ROOT = Path(__file__).parent.parent
-sys.path.insert(0, str(ROOT))
 
 from context_engine.schema_validator import SchemaValidator
-from context_engine.weight_calculator import WeightCalculator
+from context_engine.weight_calculator import WeightCalculator, WeightVector
 
 
-def main():
+def read_json(path: Path) -> dict:
+    raw = path.read_bytes()
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+
+def dump_json(obj) -> bytes:
+    return orjson.dumps(obj) if ORJSON_AVAILABLE else json.dumps(obj).encode("utf-8")
+
+
+@functools.cache
+def known_fixtures() -> frozenset[str]:
+    """ROOT-relative paths of every JSON file under tests/, listed in one walk."""
+    return frozenset(p.relative_to(ROOT).as_posix() for p in (ROOT / "tests").rglob("*.json"))
+
+
+@functools.cache
+def load_fixture(rel_path: str) -> dict | None:
+    """Parses an expected/guard fixture once per run. None if the file is missing."""
+    if rel_path not in known_fixtures():
+        return None
+    return read_json(ROOT / rel_path)
+
+
+@functools.cache
+def prohibited_component_types(guard_file: str) -> frozenset[str]:
+    """A regression guard's prohibited_component_types as a set, built once per guard file."""
+    return frozenset(load_fixture(guard_file).get("prohibited_component_types", []))
+
+
+@dataclass(frozen=True)
+class ManifestColumns:
+    """training_examples flattened into parallel tuples, indexed by example position."""
+    image_files:    tuple[str, ...]
+    categories:     tuple[str, ...]
+    profiles:       tuple[str, ...]
+    labels:         tuple[str, ...]
+    expected_files: tuple[str | None, ...]
+    guard_files:    tuple[str | None, ...]
+
+    @classmethod
+    def from_examples(cls, examples: list[dict]) -> "ManifestColumns":
+        return cls(
+            image_files=tuple(ex["image_file"] for ex in examples),
+            categories=tuple(ex["component_category"] for ex in examples),
+            profiles=tuple(ex["weight_profile"] for ex in examples),
+            labels=tuple(ex["label"] for ex in examples),
+            expected_files=tuple(ex.get("expected_output_file") for ex in examples),
+            guard_files=tuple(ex.get("fail_regression_guard") for ex in examples),
+        )
+
+    def __len__(self) -> int:
+        return len(self.image_files)
+
+
+def evaluate_result(
+    cols: ManifestColumns,
+    i: int,
+    result: dict,
+    validator: SchemaValidator,
+    weight_cache: dict[str, WeightVector],
+) -> dict:
+    """Validates one inspect_image result and checks it against expected/regression fixtures."""
+    success = bool(result.get("success"))
+    actual = result.get("output_json") if success else None
+
+    # Compare against expected output
+    passed_expected = True
+    expected_file = cols.expected_files[i]
+    if expected_file:
+        expected_data = load_fixture(expected_file)
+        if expected_data is not None:
+            # Simplistic comparison logic for the training script
+            # Real comparison might check exact fields, but we just check structural matching
+            if actual:
+                actual_count = actual.get("summary", {}).get("critical_count")
+                expected_count = expected_data.get("summary", {}).get("critical_count")
+                if actual_count != expected_count:
+                    passed_expected = False
+                    print(f"  Mismatch in critical count: Expected {expected_count} but got {actual_count}")
+        else:
+            print(f"  Expected file {expected_file} not found")
+
+    # Check regression guards
+    passed_regression = True
+    guard_file = cols.guard_files[i]
+    if guard_file:
+        guard_data = load_fixture(guard_file)
+        if guard_data is not None:
+            if actual:
+                prohibited_types = prohibited_component_types(guard_file)
+                hits = prohibited_types.intersection(
+                    anomaly.get("component_type") for anomaly in actual.get("anomalies", [])
+                )
+                if hits:
+                    passed_regression = False
+                    print(f"  Regression hit: Found prohibited component types {sorted(hits)}")
+        else:
+            print(f"  Regression guard file {guard_file} not found")
+
+    # Re-validate locally through SchemaValidator. Runs after the comparisons
+    # above because validate_obj auto-corrects output_json in place.
+    if success and "output_json" in result:
+        weight_vec = weight_cache[cols.profiles[i]]
+        if isinstance(actual, dict):
+            validation = validator.validate_obj(actual, weight_vec)
+        else:
+            validation = validator.validate(str(actual), weight_vec)
+        is_valid = validation.success
+    else:
+        is_valid = False
+
+    return {
+        "image_file": cols.image_files[i],
+        "label": cols.labels[i],
+        "success": success,
+        "schema_valid": is_valid,
+        "passed_expected": passed_expected,
+        "passed_regression": passed_regression,
+        "overall_pass": success and is_valid and passed_expected and passed_regression
+    }
+
+
+# Cap on in-flight inspect_image calls
+MAX_CONCURRENCY = 16
+
+
+def upload_inputs(volume: modal.Volume, image_files: tuple[str, ...]) -> dict[str, str]:
+    """
+    Uploads each distinct fixture image to the inputs volume once as
+    <stem>-<content hash><suffix>, and returns image_file -> path as mounted
+    in the worker. The stem keeps output filenames and run_metadata.image_path
+    traceable to the fixture; the hash keeps a stale copy from being reused.
+    """
+    keys: dict[str, str] = {}
+    sources: dict[str, Path] = {}
+    for name in dict.fromkeys(image_files):
+        local = ROOT / "tests" / "fixtures" / name
+        digest = blake2b(local.read_bytes(), digest_size=8).hexdigest()
+        # Keep the suffix: the worker derives the media type from it
+        key = f"{local.stem}-{digest}{local.suffix.lower()}"
+        keys[name] = key
+        sources.setdefault(key, local)
+
+    with volume.batch_upload(force=True) as batch:
+        for key, local in sources.items():
+            batch.put_file(local, f"/{key}")
+    print(f"Uploaded {len(sources)} unique images for {len(image_files)} examples")
+    return {name: f"/inputs/{key}" for name, key in keys.items()}
+
+
+async def main_async():
     manifest_path = ROOT / "tests" / "training_manifest.json"
     if not manifest_path.exists():
         print(f"Error: Manifest not found at {manifest_path}")
         sys.exit(1)
 
-    with open(manifest_path, "r") as f:
-        manifest = json.load(f)
+    manifest = read_json(manifest_path)
 
     app_name = manifest["modal_app_name"]
     print(f"Loaded manifest for {app_name}")
@@ -35,132 +200,102 @@ def main():
     validator = SchemaValidator()
     weight_calc = WeightCalculator()
     
-    results = []
+    cols = ManifestColumns.from_examples(manifest["training_examples"])
+    n = len(cols)
+    weight_cache = {p: weight_calc.resolve(p) for p in set(cols.profiles)}
     
-    print(f"Running {len(manifest['training_examples'])} training examples...")
-    
-    for i, example in enumerate(manifest["training_examples"], 1):
-        image_file = example["image_file"]
-        category = example["component_category"]
-        profile = example["weight_profile"]
-        label = example["label"]
-        
-        print(f"[{i}/{len(manifest['training_examples'])}] Processing {image_file} ({category})")
-        
-        # In a real environment, the image would be loaded from the inputs volume
-        # We simulate the call here using the local path for the training run
-        image_path = str(ROOT / "tests" / "fixtures" / image_file)
-        
-        try:
-            # We don't read bytes here assuming the worker will read from the volume or we pass the path
-            # But since this is a local script calling remote, we'll read bytes to send them over
-            image_bytes = Path(image_path).read_bytes()
-            
-            result = inspect_image.remote(
-                image_path=f"/inputs/{image_file}",  # Path on the modal volume
-                component_category=category,
-                weight_profile=profile,
-                image_bytes=image_bytes
-            )
-            
-            # The result output_json might be populated, or we might need to validate raw_output
-            if result.get("success") and "output_json" in result:
-                # Need to re-validate locally to match step 3 requirements?
-                # The prompt says: "Validates each result through SchemaValidator"
-                raw_output = json.dumps(result["output_json"])
-                weight_vec = weight_calc.resolve(profile)
-                validation = validator.validate(raw_output, weight_vec)
-                
-                is_valid = validation.success
-            else:
-                is_valid = False
-                validation = None
-
-            # Compare against expected output
-            passed_expected = True
-            expected_file = example.get("expected_output_file")
-            if expected_file:
-                expected_path = ROOT / expected_file
-                if expected_path.exists():
-                    with open(expected_path, "r") as f:
-                        expected_data = json.load(f)
-                    
-                    # Simplistic comparison logic for the training script
-                    # Real comparison might check exact fields, but we just check structural matching
-                    if result.get("success") and result.get("output_json"):
-                        actual = result["output_json"]
-                        actual_count = actual.get("summary", {}).get("critical_count")
-                        expected_count = expected_data.get("summary", {}).get("critical_count")
-                        if actual_count != expected_count:
-                            passed_expected = False
-                            print(f"  Mismatch in critical count: Expected {expected_count} but got {actual_count}")
-                else:
-                    print(f"  Expected file {expected_file} not found")
-            
-            # Check regression guards
-            passed_regression = True
-            guard_file = example.get("fail_regression_guard")
-            if guard_file:
-                guard_path = ROOT / guard_file
-                if guard_path.exists():
-                    with open(guard_path, "r") as f:
-                        guard_data = json.load(f)
-                    
-                    if result.get("success") and result.get("output_json"):
-                        actual = result["output_json"]
-                        prohibited_types = guard_data.get("prohibited_component_types", [])
-                        
-                        for anomaly in actual.get("anomalies", []):
-                            if anomaly.get("component_type") in prohibited_types:
-                                passed_regression = False
-                                print(f"  Regression hit: Found prohibited component type {anomaly.get('component_type')}")
-                else:
-                    print(f"  Regression guard file {guard_file} not found")
-            
-            run_result = {
-                "image_file": image_file,
-                "label": label,
-                "success": bool(result.get("success")),
-                "schema_valid": is_valid,
-                "passed_expected": passed_expected,
-                "passed_regression": passed_regression,
-                "overall_pass": bool(result.get("success")) and is_valid and passed_expected and passed_regression
-            }
-            results.append(run_result)
-            
-            status = "PASS" if run_result["overall_pass"] else "FAIL"
-            print(f"  {status}")
-            
-        except Exception as e:
-            print(f"  Error calling Modal: {e}")
-            results.append({
-                "image_file": image_file,
-                "label": label,
-                "success": False,
-                "error": str(e)
-            })
-
-    # Write summary report
+    input_volume = modal.Volume.from_name(manifest["modal_volumes"]["inputs"], create_if_missing=True)
+    remote_paths = await asyncio.to_thread(upload_inputs, input_volume, cols.image_files)
+
+    print(f"Running {n} training examples...")
+
+    # Each result is journaled (one JSON line, completion order) as soon as it
+    # has been evaluated, so a crashed run still leaves every finished result
+    # on disk. The report itself is written once at the end, in manifest
+    # order and the same indented layout as earlier reports.
+    # Requirements specify writing to the Modal output volume path defined in the manifest
+    # For a local script, we'll write it locally to `tests/` but also note the volume path
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
     report_filename = f"training_report_{timestamp}.json"
     report_path = ROOT / "tests" / report_filename
-    
-    # Requirements specify writing to the Modal output volume path defined in the manifest
-    # For a local script, we'll write it locally to `tests/` but also note the volume path
-    
+    journal_path = report_path.with_suffix(".partial.jsonl")
+    results: list[dict | None] = [None] * n
+    # Pass/fail per manifest index, set as results are recorded; results
+    # arrive out of order so the mask is indexed rather than appended to
+    done = 0
+    passed_mask = np.zeros(n, dtype=np.bool_) if NUMPY_AVAILABLE else bytearray(n)
+
+    # Images are independent, so submit them all at once. Bytes are already
+    # on the inputs volume, so each call carries only the volume path.
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+
+    with open(journal_path, "wb") as journal:
+
+        def record(i: int, run_result: dict) -> None:
+            nonlocal done
+            results[i] = run_result
+            journal.write(dump_json(run_result) + b"\n")
+            journal.flush()
+            done += 1
+            passed_mask[i] = bool(run_result.get("overall_pass", False))
+
+        async def one(i: int) -> None:
+            image_file = cols.image_files[i]
+            try:
+                async with sem:
+                    result = await inspect_image.remote.aio(
+                        image_path=remote_paths[image_file],
+                        component_category=cols.categories[i],
+                        weight_profile=cols.profiles[i],
+                    )
+                print(f"[{done + 1}/{n}] {image_file} ({cols.categories[i]})")
+                run_result = evaluate_result(cols, i, result, validator, weight_cache)
+
+                status = "PASS" if run_result["overall_pass"] else "FAIL"
+                print(f"  {status}")
+
+            except Exception as e:
+                print(f"[{done + 1}/{n}] {image_file} ({cols.categories[i]})")
+                print(f"  Error calling Modal: {e}")
+                run_result = {
+                    "image_file": image_file,
+                    "label": cols.labels[i],
+                    "success": False,
+                    "error": str(e)
+                }
+            record(i, run_result)
+
+        await asyncio.gather(*(one(i) for i in range(n)))
+
+    if NUMPY_AVAILABLE:
+        passed = int(passed_mask.sum())
+        failed_idx = np.flatnonzero(~passed_mask).tolist()
+    else:
+        passed = sum(passed_mask)
+        failed_idx = [i for i, ok in enumerate(passed_mask) if not ok]
     summary = {
         "timestamp": timestamp,
-        "total_examples": len(manifest["training_examples"]),
-        "passed": sum(1 for r in results if r.get("overall_pass", False)),
-        "failed": sum(1 for r in results if not r.get("overall_pass", False)),
-        "results": results
+        "total_examples": n,
+        "passed": passed,
+        "failed": n - passed,
+        "failed_images": [cols.image_files[i] for i in failed_idx],
+        "results": results,
     }
-    
-    with open(report_path, "w") as f:
-        json.dump(summary, f, indent=2)
-        
+
+    if ORJSON_AVAILABLE:
+        report_path.write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
+    else:
+        with open(report_path, "w") as f:
+            json.dump(summary, f, indent=2)
+    journal_path.unlink()
+
     print(f"\nTraining run complete. {summary['passed']}/{summary['total_examples']} passed.")
     print(f"Report written to {report_path}")
 
+
+def main():
+    asyncio.run(main_async())
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,43 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from context_engine.schema_validator import INSPECTION_ADAPTER
+from context_engine.subsection_router import SubsectionRouter
+
+EXPECTED_DIR = Path(__file__).parent / "expected"
+
+
+# Expected-output fixtures are read (and validated) once per session and shared
+# across test modules. Tests must not mutate them.
+# Outputs go straight from bytes through the shared adapter, with no intermediate dict.
+
+@pytest.fixture(scope="session")
+def pass_steps_bytes():
+    return (EXPECTED_DIR / "pass_steps.json").read_bytes()
+
+
+@pytest.fixture(scope="session")
+def pass_rims_bytes():
+    return (EXPECTED_DIR / "pass_rims.json").read_bytes()
+
+
+@pytest.fixture(scope="session")
+def pass_rims_data(pass_rims_bytes):
+    return json.loads(pass_rims_bytes)
+
+
+@pytest.fixture(scope="session")
+def pass_steps_output(pass_steps_bytes):
+    return INSPECTION_ADAPTER.validate_json(pass_steps_bytes)
+
+
+@pytest.fixture(scope="session")
+def pass_rims_output(pass_rims_bytes):
+    return INSPECTION_ADAPTER.validate_json(pass_rims_bytes)
+
+
+@pytest.fixture(scope="session")
+def router():
+    return SubsectionRouter()
@@ -1,18 +1,10 @@
-import os
-import sys
 import pytest
 
-# Add paths to enable local imports
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
-from context_engine.subsection_router import SubsectionRouter
 from pipeline.context_bucket import build_context_bucket
 from schemas.inspection_schema import InspectionOutput
 
-def test_prompt_verification():
+def test_prompt_verification(router):
     """Test Case 3: Prompt Verification"""
-    router = SubsectionRouter()
     
     # We test a few key known categories to ensure they load properly
     test_categories = ["engine", "hydraulics", "undercarriage"]
@@ -4,12 +4,15 @@ catrack_backend.py — CATrack AI-as-a-Service (Human-in-the-Loop Architecture)
 Three-stage HITL pipeline:
 
   Stage 1  POST /extract    Audio + image → proposed JSON for human review
+           POST /extract/upload     Same, with multipart binary audio/image
   Stage 2  (Expo UI)        Human taps to verify/correct the proposed JSON
   Stage 3  POST /synthesize Verified JSON → professional Claude narrative
+           POST /synthesize/stream  Same narrative, streamed as plain text
 
   Utility:
            GET  /health     Liveness check
            POST /transcribe Audio → plain text transcript only
+           POST /transcribe/upload  Same, with multipart binary audio
 
 Deploy:
     python -m modal deploy catrack_backend.py
@@ -20,8 +23,6 @@ Secrets required in Modal Dashboard → Secrets:
 """
 
 import base64
-import json
-import urllib.request
 import modal
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -32,10 +33,14 @@ app = modal.App("catrack-provider")
 
 volume = modal.Volume.from_name("d6n-training-vault", create_if_missing=False)
 
+# Finished Stage 3 reports keyed by a hash of the exact Claude request, so a
+# re-submitted review with no real edits skips the synthesis call
+report_cache = modal.Dict.from_name("synthesis-cache", create_if_missing=True)
+
 # Lightweight web layer — FastAPI only, no GPU
 web_image = (
     modal.Image.debian_slim()
-    .pip_install("fastapi", "pydantic", "anthropic")
+    .pip_install("fastapi", "pydantic", "anthropic", "orjson", "httpx[http2]", "python-multipart")
 )
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -65,6 +70,8 @@ RULES:
 - Close every report with: "Reported by CATrack AI Inspection System | \
 Requires technician countersignature before filing."
 - Respond with plain text only. No JSON. No lists.
+- Anomalies are given as a tab-separated table: a header row of field \
+names, then one row per anomaly.
 """
 
 
@@ -76,12 +83,59 @@ Requires technician countersignature before filing."
     image=web_image,
     volumes={"/data": volume},
     secrets=[modal.Secret.from_name("anthropic-secret")],
+    min_containers=1,        # keep the demo path free of cold starts
+    scaledown_window=600,
 )
 @modal.asgi_app()
 def fastapi_app():
     import os
-    from fastapi import FastAPI, HTTPException
+    import hashlib
+    import queue
+    import threading
+    import httpx
+    import orjson
+    from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+    from fastapi.responses import StreamingResponse
     from pydantic import BaseModel
+    from starlette.background import BackgroundTask
+
+    # One pooled HTTP/2 client per container, so /synthesize calls reuse the
+    # TLS connection to Anthropic instead of handshaking on every request
+    anthropic_http = httpx.AsyncClient(
+        base_url="https://api.anthropic.com",
+        http2=True,
+        timeout=60,
+        headers={
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json",
+        },
+    )
+
+    # Reports are appended to the volume log by one writer thread, so the
+    # open/write/commit round trip stays off the request path. Entries that
+    # queue up while a write is in progress go out together in the next one.
+    report_q: queue.SimpleQueue[str] = queue.SimpleQueue()
+
+    def _drain_reports() -> None:
+        while True:
+            batch = [report_q.get()]
+            while True:
+                try:
+                    batch.append(report_q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with open("/data/reports.txt", "a", encoding="utf-8") as f:
+                    f.write("".join(batch))
+                volume.commit()
+            except Exception as e:
+                print(f"Report log write failed (non-fatal): {e}")
+
+    threading.Thread(target=_drain_reports, name="report-log", daemon=True).start()
+
+    # Sprint-1 pipeline functions, looked up once per container
+    digest_fn = modal.Function.from_name("cat-inspect-ai-sprint1", "digest_maintenance_event")
+    transcribe_fn = modal.Cls.from_name("cat-inspect-ai-sprint1", "Ears")().transcribe
 
     # ── Request models ──────────────────────────────────────────────────────
 
@@ -126,7 +180,10 @@ def fastapi_app():
         return {
             "status": "ok",
             "version": "2.0.0",
-            "endpoints": ["/extract", "/synthesize", "/transcribe", "/health"],
+            "endpoints": [
+                "/extract", "/extract/upload", "/synthesize", "/synthesize/stream",
+                "/transcribe", "/transcribe/upload", "/health",
+            ],
         }
 
     # ── Stage 1: Extract ────────────────────────────────────────────────────
@@ -157,17 +214,35 @@ def fastapi_app():
             except Exception:
                 raise HTTPException(400, detail="image_b64 is not valid base64.")
 
-        # Delegate to the existing sprint-1 pipeline functions
-        digest = modal.Function.from_name(
-            "cat-inspect-ai-sprint1", "digest_maintenance_event"
-        )
+        return await _run_extract(audio_bytes, image_bytes, req.job_id)
+
+    @web.post("/extract/upload")
+    async def extract_upload(
+        audio: UploadFile = File(...),
+        image: UploadFile | None = File(None),
+        job_id: str | None = Form(None),
+    ):
+        """
+        STAGE 1 — same as /extract, but audio/image arrive as multipart
+        binary parts instead of base64 strings: ~33% less upload from the
+        phone and no decode pass over the audio buffer.
+        """
+        audio_bytes = await audio.read()
+        image_bytes = await image.read() if image is not None else None
+        return await _run_extract(audio_bytes, image_bytes or None, job_id)
+
+    async def _run_extract(audio_bytes: bytes, image_bytes: bytes | None, job_id: str | None) -> dict:
+        # Delegate to the existing sprint-1 pipeline. digest_maintenance_event
+        # already runs Whisper and Claude vision concurrently and only waits
+        # on the transcript for the adapter call; awaiting it here keeps the
+        # event loop free for other requests while it runs.
         try:
-            result = digest.remote(audio_bytes, image_bytes)
+            result = await digest_fn.remote.aio(audio_bytes, image_bytes)
         except Exception as e:
             raise HTTPException(500, detail=f"Extraction failed: {str(e)}")
 
-        if req.job_id:
-            result["job_id"] = req.job_id
+        if job_id:
+            result["job_id"] = job_id
 
         # Tag this as a Stage 1 result so Expo knows it needs human review
         result["_stage"] = "proposed"
@@ -177,23 +252,29 @@ def fastapi_app():
 
     # ── Stage 3: Synthesize ─────────────────────────────────────────────────
 
-    @web.post("/synthesize")
-    async def synthesize(req: SynthesizeRequest):
+    def _anomaly_table(anomalies: list[dict]) -> str:
         """
-        STAGE 3 — Professional report generation. Call this ONLY after the
-        human has reviewed and approved/edited the Stage 1 output in the Expo UI.
-
-        Takes the verified JSON dict and asks Claude to write a professional
-        paragraph-style inspection report in Construction Inspector tone.
-
-        The report is ready to hand to the foreman or file in the system.
+        Column-major rendering of the anomaly list: field names appear once in
+        a TSV header instead of being repeated in every JSON object, which
+        keeps the prompt short for multi-anomaly inspections. Columns are the
+        union of keys in first-seen order, so no field is dropped.
         """
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise HTTPException(500, detail="ANTHROPIC_API_KEY not configured.")
-
-        # Build the prompt from the verified JSON
-        verified = req.verified_json
+        if not anomalies:
+            return "(none)"
+        cols = list(dict.fromkeys(k for a in anomalies for k in a))
+
+        def cell(value) -> str:
+            if value is None:
+                return ""
+            if not isinstance(value, str):
+                value = orjson.dumps(value).decode()
+            return value.replace("\t", " ").replace("\n", " ")
+
+        rows = ("\t".join(cell(a.get(c)) for c in cols) for a in anomalies)
+        return "\t".join(cols) + "\n" + "\n".join(rows)
+
+    def _synthesis_payload(verified: dict) -> dict:
+        """Builds the Anthropic Messages request for a verified inspection."""
         summary = verified.get("inspection_summary", {})
         anomalies = verified.get("anomalies", [])
         transcript = verified.get("raw_transcript", "")
@@ -202,49 +283,69 @@ def fastapi_app():
         user_prompt = (
             f"Write a professional inspection report based on the following "
             f"verified inspection data.\n\n"
-            f"INSPECTION SUMMARY:\n{json.dumps(summary, indent=2)}\n\n"
-            f"ANOMALIES FOUND ({len(anomalies)}):\n{json.dumps(anomalies, indent=2)}\n\n"
+            f"INSPECTION SUMMARY:\n{orjson.dumps(summary, option=orjson.OPT_INDENT_2).decode()}\n\n"
+            f"ANOMALIES FOUND ({len(anomalies)}):\n{_anomaly_table(anomalies)}\n\n"
             f"TECHNICIAN VOICE NOTE (verbatim): \"{transcript}\"\n\n"
             f"AI SEVERITY SIGNAL: {adapter.get('severity', 'N/A')} "
             f"({adapter.get('source', 'unknown')})\n\n"
             f"Write the report now:"
         )
 
-        headers = {
-            "x-api-key": api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json",
-        }
-        data = {
+        return {
             "model": "claude-sonnet-4-5",
             "max_tokens": 1024,
             "system": SYNTHESIS_SYSTEM_PROMPT,
             "messages": [{"role": "user", "content": user_prompt}],
         }
 
-        req_obj = urllib.request.Request(
-            "https://api.anthropic.com/v1/messages",
-            data=json.dumps(data).encode("utf-8"),
-            headers=headers,
-        )
+    def _log_report(job_id: str | None, report_text: str) -> None:
+        """Queue a report for the volume log; the writer thread does the I/O."""
+        rule = "=" * 60
+        header = f"JOB ID: {job_id}\n" if job_id else ""
+        report_q.put(f"\n{rule}\n{header}{report_text}\n{rule}\n")
 
-        try:
-            with urllib.request.urlopen(req_obj) as response:
-                result = json.loads(response.read().decode("utf-8"))
+    def _require_api_key() -> str:
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise HTTPException(500, detail="ANTHROPIC_API_KEY not configured.")
+        return api_key
+
+    @web.post("/synthesize")
+    async def synthesize(req: SynthesizeRequest):
+        """
+        STAGE 3 — Professional report generation. Call this ONLY after the
+        human has reviewed and approved/edited the Stage 1 output in the Expo UI.
+
+        Takes the verified JSON dict and asks Claude to write a professional
+        paragraph-style inspection report in Construction Inspector tone.
+
+        The report is ready to hand to the foreman or file in the system.
+        """
+        api_key = _require_api_key()
+        verified = req.verified_json
+        payload = _synthesis_payload(verified)
+        # Hash what Claude would see (model, system prompt and the rendered
+        # data), so prompt changes in a redeploy never serve a stale report
+        cache_key = hashlib.blake2b(
+            orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).hexdigest()
+
+        report_text = await report_cache.get.aio(cache_key)
+        if report_text is None:
+            try:
+                response = await anthropic_http.post(
+                    "/v1/messages",
+                    headers={"x-api-key": api_key},
+                    content=orjson.dumps(payload),
+                )
+                response.raise_for_status()
+                result = orjson.loads(response.content)
                 report_text = result["content"][0]["text"].strip()
-        except Exception as e:
-            raise HTTPException(500, detail=f"Claude synthesis failed: {str(e)}")
+            except Exception as e:
+                raise HTTPException(500, detail=f"Claude synthesis failed: {str(e)}")
+            await report_cache.put.aio(cache_key, report_text)
 
-        # Save to volume as a persistent log (append mode)
-        try:
-            with open("/data/reports.txt", "a", encoding="utf-8") as f:
-                f.write(f"\n{'='*60}\n")
-                if req.job_id:
-                    f.write(f"JOB ID: {req.job_id}\n")
-                f.write(report_text)
-                f.write(f"\n{'='*60}\n")
-        except Exception:
-            pass  # Non-fatal — don't fail the response if volume write fails
+        _log_report(req.job_id, report_text)
 
         return {
             "report": report_text,
@@ -253,6 +354,62 @@ def fastapi_app():
             "_stage": "final",
         }
 
+    @web.post("/synthesize/stream")
+    async def synthesize_stream(req: SynthesizeRequest):
+        """
+        STAGE 3 (streaming) — same report as /synthesize, returned as
+        text/plain and flushed as Claude generates it, so the UI can render
+        the first sentence without waiting for the whole report.
+        The volume log is written after the last chunk is sent, and only
+        for a report that streamed through to message_stop.
+        """
+        api_key = _require_api_key()
+        data = _synthesis_payload(req.verified_json)
+        data["stream"] = True
+        parts: list[str] = []
+        completed = False
+
+        async def relay():
+            nonlocal completed
+            async with anthropic_http.stream(
+                "POST",
+                "/v1/messages",
+                headers={"x-api-key": api_key},
+                content=orjson.dumps(data),
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    yield f"[synthesis failed: HTTP {response.status_code}]"
+                    return
+                async for line in response.aiter_lines():
+                    if not line.startswith("data: "):
+                        continue
+                    event = orjson.loads(line[6:])
+                    kind = event.get("type")
+                    if kind == "content_block_delta":
+                        text = event["delta"].get("text", "")
+                        if text:
+                            parts.append(text)
+                            yield text
+                    elif kind == "error":
+                        # e.g. overloaded_error mid-stream; the status was already 200
+                        error = event.get("error") or {}
+                        yield f"\n[synthesis failed: {error.get('type', 'error')}]"
+                        return
+                    elif kind == "message_stop":
+                        completed = True
+
+        def log_complete_report() -> None:
+            report_text = "".join(parts).strip()
+            if completed and report_text:
+                _log_report(req.job_id, report_text)
+
+        return StreamingResponse(
+            relay(),
+            media_type="text/plain; charset=utf-8",
+            background=BackgroundTask(log_complete_report),
+        )
+
     # ── Utility: Transcribe only ─────────────────────────────────────────────
 
     @web.post("/transcribe")
@@ -263,9 +420,16 @@ def fastapi_app():
         except Exception:
             raise HTTPException(400, detail="audio_b64 is not valid base64.")
 
-        fn = modal.Function.from_name("cat-inspect-ai-sprint1", "transcribe_audio")
+        return await _run_transcribe(audio_bytes)
+
+    @web.post("/transcribe/upload")
+    async def transcribe_upload(audio: UploadFile = File(...)):
+        """Audio-only transcription from a multipart binary upload."""
+        return await _run_transcribe(await audio.read())
+
+    async def _run_transcribe(audio_bytes: bytes) -> dict:
         try:
-            transcript = fn.remote(audio_bytes)
+            transcript = await transcribe_fn.remote.aio(audio_bytes)
         except Exception as e:
             raise HTTPException(500, detail=f"Transcription failed: {str(e)}")
 
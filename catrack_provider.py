@@ -5,7 +5,8 @@ Deployed on lanzgaldo as: catrack-provider
 
 This app serves two purposes:
   1. FastAPI gateway that proxies /extract, /synthesize, /transcribe to
-     cleanpxe web endpoints over HTTPS.
+     cleanpxe web endpoints over HTTPS. /extract/upload and
+     /transcribe/upload take the audio/image as multipart binary parts.
   2. Hosts the fine-tuned Mistral-7B LoRA adapter classifier, since the
      trained weights live on lanzgaldo's d6n-training-vault volume.
 
@@ -18,19 +19,29 @@ The cleanpxe backend must also be deployed:
 
 import os
 import json
+import base64
+import time
+import asyncio
+import functools
 import modal
 
 app = modal.App("catrack-provider")
 
-gateway_image = modal.Image.debian_slim().pip_install("requests", "fastapi[standard]")
+gateway_image = modal.Image.debian_slim().pip_install("requests", "httpx", "fastapi[standard]", "msgspec")
 
 # ── Adapter infrastructure (Mistral-7B with LoRA) ──
 adapter_image = (
     modal.Image.debian_slim(python_version="3.11")
     .pip_install(["torch", "transformers", "peft", "accelerate", "bitsandbytes", "fastapi[standard]"])
 )
+vllm_image = (
+    modal.Image.debian_slim(python_version="3.11")
+    # Pinned: newer releases renamed GuidedDecodingParams / guided_decoding
+    .pip_install(["vllm==0.9.2", "fastapi[standard]"])
+)
 adapter_volume = modal.Volume.from_name("d6n-training-vault", create_if_missing=True)
 ADAPTER_PROD    = "/data/adapters/production/v1"
+ADAPTER_MERGED  = "/data/adapters/production/v1_merged"   # written by merge_adapter
 BASE_MODEL      = "mistralai/Mistral-7B-Instruct-v0.2"
 MODEL_CACHE_DIR = "/data/models/mistral-7b"
 
@@ -52,39 +63,67 @@ BACKEND = {
 # FINE-TUNED ADAPTER CLASSIFIER (runs on lanzgaldo GPU with trained weights)
 # ─────────────────────────────────────────────────────────────────────────────
 
-@app.function(
+@app.cls(
     image=adapter_image,
     gpu="A10G",
     timeout=120,
-    min_containers=1,
+    # No min_containers: once merge_adapter has run this is only the
+    # pre-merge fallback for VLLMAdapterClassifier, not an always-on GPU
+    scaledown_window=1800,   # weights stay loaded through idle gaps
     volumes={"/data": adapter_volume},
 )
-def classify_with_adapter(transcript: str) -> dict:
-    import os, gc, torch, json, re
-    from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
-    from peft import PeftModel
+class AdapterClassifier:
+    """
+    Keeps the NF4-quantized base model, tokenizer and LoRA adapter resident
+    for the container's lifetime; each classify() call is one generate(), and
+    classify_batch() runs a whole list through a single padded generate().
+    """
 
-    os.environ["PYTORCH_ALLOC_CONF"] = "expandable_segments:True"
+    @modal.enter()
+    def load(self):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+        from peft import PeftModel
 
-    if not os.path.exists(ADAPTER_PROD):
-        return {"severity": None, "rationale": None, "source": "no_adapter"}
+        os.environ["PYTORCH_ALLOC_CONF"] = "expandable_segments:True"
 
-    bnb_config = BitsAndBytesConfig(
-        load_in_4bit=True,
-        bnb_4bit_quant_type="nf4",
-        bnb_4bit_use_double_quant=True,
-        bnb_4bit_compute_dtype=torch.float16,
-    )
+        self.model = None
+        if not os.path.exists(ADAPTER_PROD):
+            return
 
-    base = AutoModelForCausalLM.from_pretrained(
-        BASE_MODEL, quantization_config=bnb_config,
-        device_map="auto", cache_dir=MODEL_CACHE_DIR,
-    )
-    tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL, cache_dir=MODEL_CACHE_DIR)
-    model = PeftModel.from_pretrained(base, ADAPTER_PROD)
-    model.eval()
+        bnb_config = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type="nf4",
+            bnb_4bit_use_double_quant=True,
+            bnb_4bit_compute_dtype=torch.float16,
+        )
 
-    prompt = (
+        base = AutoModelForCausalLM.from_pretrained(
+            BASE_MODEL, quantization_config=bnb_config,
+            device_map="auto", cache_dir=MODEL_CACHE_DIR,
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(BASE_MODEL, cache_dir=MODEL_CACHE_DIR)
+        # Mistral ships without a pad token; batched prompts are left-padded
+        # so generation continues from each prompt's real last token
+        self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = "left"
+        self.model = PeftModel.from_pretrained(base, ADAPTER_PROD).eval()
+
+    @modal.method()
+    def classify(self, transcript: str) -> dict:
+        if self.model is None:
+            return {"severity": None, "rationale": None, "source": "no_adapter"}
+        return _classify(self.model, self.tokenizer, transcript)
+
+    @modal.method()
+    def classify_batch(self, transcripts: list[str]) -> list[dict]:
+        if self.model is None:
+            return [{"severity": None, "rationale": None, "source": "no_adapter"} for _ in transcripts]
+        return _classify_many(self.model, self.tokenizer, transcripts)
+
+
+def _adapter_prompt(transcript: str) -> str:
+    return (
         "You are a CAT-certified D6N Track-Type Dozer technician and field inspector. "
         "You have memorized the D6N service manuals, parts reference guide, and fluid specifications.\n\n"
         "Given a field observation about the machine and a relevant excerpt from the service "
@@ -93,30 +132,43 @@ def classify_with_adapter(transcript: str) -> dict:
         f"OBSERVATION: {transcript}\n\nOutput JSON:"
     )
 
-    inputs = tokenizer(prompt, return_tensors="pt").to("cuda")
-    with torch.no_grad():
-        outputs = model.generate(
-            **inputs, max_new_tokens=256, do_sample=False,
-            temperature=1.0, pad_token_id=tokenizer.eos_token_id,
-        )
-    generated = tokenizer.decode(outputs[0][inputs.input_ids.shape[1]:], skip_special_tokens=True)
 
-    del inputs, outputs, model, base
-    gc.collect()
-    torch.cuda.empty_cache()
+# Grammar for guided decoding on the vLLM path: the engine can only emit
+# tokens that keep the output a valid instance, and stops once it closes.
+# String caps keep a full object inside the max_tokens budget.
+ADAPTER_OUTPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "severity":           {"enum": ["ASAP", "Soon", "Okay"]},
+        "rationale":          {"type": "string", "maxLength": 300},
+        "recommended_action": {"type": "string", "maxLength": 200},
+        "component":          {"type": "string", "maxLength": 80},
+    },
+    "required": ["severity"],
+    "additionalProperties": False,
+}
+
+
+def _prediction(pred: dict) -> dict:
+    return {
+        "severity": pred.get("severity"),
+        "rationale": pred.get("rationale"),
+        "recommended_action": pred.get("recommended_action"),
+        "component": pred.get("component"),
+        "source": "finetuned_adapter",
+    }
+
+
+def _parse_adapter_output(generated: str) -> dict:
+    """Lenient parse for unconstrained (HF generate) output."""
+    import re
 
     try:
         clean = generated.strip()
-        if clean.count("{") > clean.count("}"):
-            clean += "}" * (clean.count("{") - clean.count("}"))
-        pred = json.loads(clean)
-        return {
-            "severity": pred.get("severity"),
-            "rationale": pred.get("rationale"),
-            "recommended_action": pred.get("recommended_action"),
-            "component": pred.get("component"),
-            "source": "finetuned_adapter",
-        }
+        unclosed = clean.count("{") - clean.count("}")
+        if unclosed > 0:
+            clean += "}" * unclosed
+        return _prediction(json.loads(clean))
     except Exception:
         sev = re.search(r'"severity"\s*:\s*"(ASAP|Soon|Okay)"', generated)
         return {
@@ -126,7 +178,154 @@ def classify_with_adapter(transcript: str) -> dict:
         }
 
 
-@app.function(image=adapter_image, gpu="A10G", timeout=120, min_containers=1, volumes={"/data": adapter_volume})
+def _classify(model, tokenizer, transcript: str) -> dict:
+    """Single greedy generation + severity parse against an already-loaded model."""
+    return _classify_many(model, tokenizer, [transcript])[0]
+
+
+def _classify_many(model, tokenizer, transcripts: list[str]) -> list[dict]:
+    """One padded greedy generate() over every transcript, then a parse per row."""
+    import torch
+
+    prompts = [_adapter_prompt(t) for t in transcripts]
+    inputs = tokenizer(prompts, return_tensors="pt", padding=True).to("cuda")
+    with torch.no_grad():
+        outputs = model.generate(
+            **inputs, max_new_tokens=256, do_sample=False,
+            temperature=1.0, pad_token_id=tokenizer.eos_token_id,
+        )
+    # Left padding ends every prompt at the same column, so each row's
+    # generated tokens start right after it
+    prompt_len = inputs.input_ids.shape[1]
+    generated = tokenizer.batch_decode(outputs[:, prompt_len:], skip_special_tokens=True)
+    return [_parse_adapter_output(g) for g in generated]
+
+
+# ── Merged adapter served through vLLM ──
+# merge_adapter folds the LoRA deltas into fp16 base weights once; the vLLM
+# engine then serves the merged model. The offline LLM engine isn't
+# thread-safe, so the class takes one input at a time; classify_batch hands
+# a whole list to a single generate() call, which vLLM batches internally.
+
+# How often a container still on the HF fallback looks for merged weights
+MERGE_RECHECK_SECONDS = 60
+VLLM_MAX_MODEL_LEN = 4096
+VLLM_MAX_TOKENS = 256
+# Slack for re-tokenizing a truncated transcript inside the full prompt
+PROMPT_TOKEN_MARGIN = 16
+
+
+def _parse_guided_output(text: str) -> dict:
+    """Guided output is valid JSON unless max_tokens cut it off; then parse leniently."""
+    try:
+        return _prediction(json.loads(text))
+    except json.JSONDecodeError:
+        return _parse_adapter_output(text)
+
+@app.function(
+    image=adapter_image,
+    gpu="A10G",
+    timeout=1800,
+    volumes={"/data": adapter_volume},
+)
+def merge_adapter() -> str:
+    """Offline job: merge the production LoRA into the base model and save it."""
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer
+    from peft import PeftModel
+
+    # Merging needs unquantized weights; the NF4 base used for HF serving can't be merged into
+    base = AutoModelForCausalLM.from_pretrained(
+        BASE_MODEL, torch_dtype=torch.float16,
+        device_map="auto", cache_dir=MODEL_CACHE_DIR,
+    )
+    merged = PeftModel.from_pretrained(base, ADAPTER_PROD).merge_and_unload()
+    merged.save_pretrained(ADAPTER_MERGED, safe_serialization=True)
+    AutoTokenizer.from_pretrained(BASE_MODEL, cache_dir=MODEL_CACHE_DIR).save_pretrained(ADAPTER_MERGED)
+    adapter_volume.commit()
+    return ADAPTER_MERGED
+
+
+@app.cls(
+    image=vllm_image,
+    gpu="A10G",
+    timeout=120,
+    min_containers=1,
+    scaledown_window=1800,   # weights stay loaded through idle gaps
+    volumes={"/data": adapter_volume},
+)
+class VLLMAdapterClassifier:
+    """
+    Serves the merged adapter from ADAPTER_MERGED. Until merge_adapter has
+    been run, classify() defers to the HF AdapterClassifier.
+    """
+
+    @modal.enter()
+    def load(self):
+        self.llm = None
+        self._load_engine()
+
+    def _load_engine(self) -> None:
+        from vllm import LLM, SamplingParams
+        from vllm.sampling_params import GuidedDecodingParams
+
+        self._checked_at = time.monotonic()
+        if not os.path.exists(ADAPTER_MERGED):
+            return
+        self.llm = LLM(model=ADAPTER_MERGED, dtype="float16", max_model_len=VLLM_MAX_MODEL_LEN)
+        self.tokenizer = self.llm.get_tokenizer()
+        # Transcript tokens that fit beside the template and the output budget
+        self.transcript_budget = (
+            VLLM_MAX_MODEL_LEN - VLLM_MAX_TOKENS - PROMPT_TOKEN_MARGIN
+            - len(self.tokenizer.encode(_adapter_prompt("")))
+        )
+        self.sampling = SamplingParams(
+            max_tokens=VLLM_MAX_TOKENS,
+            temperature=0,
+            guided_decoding=GuidedDecodingParams(json=ADAPTER_OUTPUT_SCHEMA),
+        )
+
+    def _engine(self):
+        """
+        The vLLM engine, or None while the merged weights don't exist. A warm
+        container that started before merge_adapter ran re-checks the volume
+        (at most every MERGE_RECHECK_SECONDS) instead of forwarding forever.
+        """
+        if self.llm is None and time.monotonic() - self._checked_at >= MERGE_RECHECK_SECONDS:
+            adapter_volume.reload()
+            self._load_engine()
+        return self.llm
+
+    def _prompt(self, transcript: str) -> str:
+        # vLLM rejects prompts past max_model_len outright; keep the start of
+        # an over-long voice note rather than failing the request
+        ids = self.tokenizer.encode(transcript, add_special_tokens=False)
+        if len(ids) > self.transcript_budget:
+            transcript = self.tokenizer.decode(ids[:self.transcript_budget])
+        return _adapter_prompt(transcript)
+
+    @modal.method()
+    def classify(self, transcript: str) -> dict:
+        if self._engine() is None:
+            return AdapterClassifier().classify.remote(transcript)
+        out = self.llm.generate([self._prompt(transcript)], self.sampling, use_tqdm=False)
+        return _parse_guided_output(out[0].outputs[0].text)
+
+    @modal.method()
+    def warmup(self) -> bool:
+        """No-op; the call itself starts a container and runs load()."""
+        return self._engine() is not None
+
+    @modal.method()
+    def classify_batch(self, transcripts: list[str]) -> list[dict]:
+        if self._engine() is None:
+            return AdapterClassifier().classify_batch.remote(transcripts)
+        outs = self.llm.generate([self._prompt(t) for t in transcripts], self.sampling, use_tqdm=False)
+        return [_parse_guided_output(o.outputs[0].text) for o in outs]
+
+
+# Pure proxy to VLLMAdapterClassifier, so a warm CPU container is enough
+@app.function(image=gateway_image, timeout=120, min_containers=1)
 @modal.fastapi_endpoint(method="POST")
 def web_classify(item: dict):
     """HTTPS endpoint: Run the fine-tuned adapter classifier.
@@ -135,15 +334,18 @@ def web_classify(item: dict):
     """
     transcript = item.get("transcript", "")
     if not transcript:
+        # cleanpxe sends an empty transcript while Whisper is still running:
+        # start a classifier container now so the real call lands warm
+        VLLMAdapterClassifier().warmup.spawn()
         return {"severity": None, "rationale": None, "source": "no_transcript"}
-    return classify_with_adapter.remote(transcript)
+    return VLLMAdapterClassifier().classify.remote(transcript)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
 # FASTAPI GATEWAY (proxies to cleanpxe over HTTPS)
 # ─────────────────────────────────────────────────────────────────────────────
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, File, Form, HTTPException, Request, Response, UploadFile
 from pydantic import BaseModel
 from typing import Optional
 
@@ -177,12 +379,19 @@ class TranscribeRequest(BaseModel):
     audio_b64: str
 
 
+@functools.cache
+def _http():
+    """Shared requests.Session, so calls to cleanpxe keep their TLS connections warm."""
+    import requests
+    return requests.Session()
+
+
 def _call_backend(endpoint_key: str, payload: dict, timeout: int = 180) -> dict:
     """Call a cleanpxe web endpoint over HTTPS."""
     import requests as req
     url = BACKEND[endpoint_key]
     try:
-        resp = req.post(url, json=payload, timeout=timeout)
+        resp = _http().post(url, json=payload, timeout=timeout)
         if resp.status_code != 200:
             raise HTTPException(
                 status_code=resp.status_code,
@@ -195,17 +404,34 @@ def _call_backend(endpoint_key: str, payload: dict, timeout: int = 180) -> dict:
         raise HTTPException(502, f"Backend ({endpoint_key}) unreachable: {str(e)[:200]}")
 
 
-@web_app.get("/health")
-def health():
-    import requests as req
-    backend_status = "unknown"
+# Last backend probe as (monotonic timestamp, status); rapid health polls
+# within HEALTH_CACHE_TTL reuse it instead of each hitting cleanpxe
+HEALTH_CACHE_TTL = 2.0
+_backend_health: tuple[float, object] = (float("-inf"), None)
+
+
+async def _probe_backend() -> object:
+    global _backend_health
+    import httpx
+
+    checked_at, cached = _backend_health
+    if time.monotonic() - checked_at < HEALTH_CACHE_TTL:
+        return cached
     try:
-        r = req.get(BACKEND["health"], timeout=5)
-        backend_status = r.json() if r.status_code == 200 else f"error:{r.status_code}"
+        async with httpx.AsyncClient(timeout=1.0) as client:
+            r = await client.get(BACKEND["health"])
+        status = r.json() if r.status_code == 200 else f"error:{r.status_code}"
     except Exception as e:
-        backend_status = f"unreachable: {str(e)[:100]}"
+        status = f"unreachable: {str(e)[:100]}"
+    _backend_health = (time.monotonic(), status)
+    return status
 
+
+@web_app.get("/health")
+async def health():
+    probe = asyncio.create_task(_probe_backend())
     adapter_exists = os.path.exists(ADAPTER_PROD) if os.path.exists("/data") else "volume_not_mounted"
+    backend_status = await probe
 
     return {
         "status": "ok",
@@ -213,29 +439,70 @@ def health():
         "gateway": "lanzgaldo",
         "adapter_available": adapter_exists,
         "backend": backend_status,
-        "endpoints": ["/extract", "/synthesize", "/transcribe", "/classify", "/health"],
+        "endpoints": [
+            "/extract", "/extract/upload", "/synthesize",
+            "/transcribe", "/transcribe/upload", "/classify", "/health",
+        ],
     }
 
 
+MSGPACK = "application/msgpack"
+
+
+def _negotiate(request: Request, result: dict):
+    """Encode result as MessagePack when the client asks for it, else JSON."""
+    if MSGPACK not in request.headers.get("accept", ""):
+        return result
+    import msgspec
+    return Response(msgspec.msgpack.encode(result), media_type=MSGPACK)
+
+
 @web_app.post("/extract")
-def extract(req: ExtractRequest):
+def extract(req: ExtractRequest, request: Request):
     """STAGE 1 — Full AI extraction. Bridges to cleanpxe for vision+JSON."""
     payload = {"audio_b64": req.audio_b64, "category": req.category}
     if req.image_b64:
         payload["image_b64"] = req.image_b64
+    return _negotiate(request, _extract(payload, req.job_id))
+
+
+@web_app.post("/extract/upload")
+def extract_upload(
+    request: Request,
+    audio: UploadFile = File(...),
+    image: Optional[UploadFile] = File(None),
+    job_id: Optional[str] = Form(None),
+    category: str = Form("auto"),
+):
+    """STAGE 1 — same as /extract, but audio/image arrive as multipart binary
+    parts, so the client uploads ~33% less than with base64-in-JSON.
+    """
+    payload = {"audio_b64": _upload_b64(audio), "category": category}
+    if image is not None:
+        payload["image_b64"] = _upload_b64(image)
+    return _negotiate(request, _extract(payload, job_id))
+
+
+def _upload_b64(upload: UploadFile) -> str:
+    # cleanpxe's web endpoints still take JSON; encode here, on the
+    # datacenter side, rather than on the client's uplink
+    return base64.b64encode(upload.file.read()).decode("ascii")
+
+
+def _extract(payload: dict, job_id: Optional[str]) -> dict:
     result = _call_backend("extract", payload, timeout=180)
-    if req.job_id:
-        result["job_id"] = req.job_id
+    if job_id:
+        result["job_id"] = job_id
     return result
 
 
 @web_app.post("/synthesize")
-def synthesize(req: SynthesizeRequest):
+def synthesize(req: SynthesizeRequest, request: Request):
     """STAGE 3 — Professional report generation after human review."""
     result = _call_backend("synthesize", {"verified_json": req.verified_json}, timeout=60)
     if req.job_id:
         result["job_id"] = req.job_id
-    return result
+    return _negotiate(request, result)
 
 
 @web_app.post("/transcribe")
@@ -244,6 +511,12 @@ def transcribe(req: TranscribeRequest):
     return _call_backend("transcribe", {"audio_b64": req.audio_b64}, timeout=60)
 
 
+@web_app.post("/transcribe/upload")
+def transcribe_upload(audio: UploadFile = File(...)):
+    """Audio-only transcription from a multipart binary upload."""
+    return _call_backend("transcribe", {"audio_b64": _upload_b64(audio)}, timeout=60)
+
+
 @web_app.post("/classify")
 def classify_endpoint(item: dict):
     """Run the fine-tuned Mistral-7B adapter classifier on lanzgaldo.
@@ -252,10 +525,11 @@ def classify_endpoint(item: dict):
     transcript = item.get("transcript", "")
     if not transcript:
         return {"severity": None, "rationale": None, "source": "no_transcript"}
-    return classify_with_adapter.remote(transcript)
+    return VLLMAdapterClassifier().classify.remote(transcript)
 
 
-@app.function(image=gateway_image, timeout=300)
+@app.function(image=gateway_image, timeout=300, min_containers=1)
+@modal.concurrent(max_inputs=20)  # one warm gateway absorbs bursts; handlers mostly wait on cleanpxe
 @modal.asgi_app()
 def fastapi_app():
     return web_app
@@ -95,6 +95,8 @@ export interface ExtractRequest {
 export interface ExtractResponse {
   context_path: string;
   inspection_output: InspectionOutput;
+  /** Stages that fell back to an empty or error result ("transcript", "adapter", "vision", "note") */
+  degraded?: string[];
   job_id?: string;
 }
 
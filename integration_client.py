@@ -1,6 +1,7 @@
 """
 CATrack Inspection AI — Teammate Client
 pip install requests  (that's the only dependency)
+pip install msgspec   (optional: responses come back as MessagePack)
 
 Usage:
     from integration_client import run_inspection, pretty_print
@@ -19,24 +20,112 @@ Usage:
 """
 
 import base64
+import contextlib
+import hashlib
+import io
 import json
+import os
 import requests
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
 
 API_URL = "https://lanzgaldo--catrack-provider-fastapi-app.modal.run"
 
+# run_inspection results, keyed by a hash of the audio (+ image) content
+CACHE_DIR = Path(os.environ.get("CATRACK_CACHE_DIR", "~/.cache/catrack")).expanduser()
+
+# One pooled session for every call so back-to-back requests to the Modal
+# endpoint reuse the keep-alive connection instead of a fresh TLS handshake.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5,
+                      status_forcelist=[502, 503, 504]),
+))
+if MSGSPEC_AVAILABLE:
+    _SESSION.headers["Accept"] = "application/msgpack, application/json"
+
+
+def close() -> None:
+    """Release pooled connections. Call once when the CLI is done."""
+    _SESSION.close()
+
+
+_B64_CHUNK = 57 * 1024  # multiple of 3, so no padding lands mid-stream
+
 
 def _b64(path: str) -> str:
-    with open(path, "rb") as f:
-        return base64.b64encode(f.read()).decode()
+    buf = io.BytesIO()
+    with open(path, "rb", buffering=1 << 20) as f:
+        while chunk := f.read(_B64_CHUNK):
+            buf.write(base64.b64encode(chunk))
+    return buf.getvalue().decode("ascii")
+
+
+@contextlib.contextmanager
+def _open_parts(**paths: str | None):
+    """Open each given path as a multipart file part; None paths are skipped."""
+    with contextlib.ExitStack() as stack:
+        yield {
+            name: (os.path.basename(path), stack.enter_context(open(path, "rb")))
+            for name, path in paths.items() if path
+        }
+
+
+def _cache_key(*paths: str | None) -> str:
+    """blake2b over each file's own digest, so audio-only and audio+image differ."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        part = hashlib.blake2b(digest_size=16)
+        if path:
+            with open(path, "rb", buffering=1 << 20) as f:
+                while chunk := f.read(1 << 20):
+                    part.update(chunk)
+        h.update(part.digest())
+    return h.hexdigest()
+
+
+def _cache_write(path: Path, result: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(result))
+    os.replace(tmp, path)  # atomic: readers never see a half-written file
+
+
+def _cacheable(result: dict) -> bool:
+    """Only a run where every stage succeeded is worth replaying from disk."""
+    note = result.get("inspection_output")
+    return not (
+        result.get("degraded")
+        or "error" in result
+        or not isinstance(note, dict)
+        or "error" in note
+    )
+
+
+def _decode(resp: requests.Response) -> dict:
+    """Decode a result body, MessagePack if the gateway negotiated it."""
+    if resp.headers.get("content-type", "").startswith("application/msgpack"):
+        return msgspec.msgpack.decode(resp.content)
+    return resp.json()
 
 
 def health_check() -> dict:
     """Check the API is alive."""
-    return requests.get(f"{API_URL}/health", timeout=10).json()
+    return _SESSION.get(f"{API_URL}/health", timeout=10).json()
 
 
 def run_inspection(audio_path: str, image_path: str | None = None,
-                   job_id: str | None = None, timeout: int = 180) -> dict:
+                   job_id: str | None = None, timeout: int = 180,
+                   multipart: bool = True, use_cache: bool = True) -> dict:
     """
     STAGE 1 — Full CAT D6N AI extraction from a voice note + optional photo.
     Runs Whisper, fine-tuned LoRA adapter, Claude vision, and structured note
@@ -49,17 +138,40 @@ def run_inspection(audio_path: str, image_path: str | None = None,
       adapter_classification -> fine-tuned model severity signal
 
     This output is meant for human review in the Expo UI before Stage 3.
+
+    Files go up as multipart binary parts to /extract/upload. Pass
+    multipart=False to use the base64-in-JSON /extract route instead.
+
+    Untagged runs (job_id=None) are cached in CACHE_DIR by file content, so
+    re-running the same voice note skips the pipeline entirely. Runs with an
+    empty transcript or a failed stage are not cached. Pass use_cache=False
+    to force a fresh extraction.
     """
-    payload = {"audio_b64": _b64(audio_path)}
-    if image_path:
-        payload["image_b64"] = _b64(image_path)
-    if job_id:
-        payload["job_id"] = job_id
+    cache_path = None
+    if use_cache and job_id is None:
+        cache_path = CACHE_DIR / f"{_cache_key(audio_path, image_path)}.json"
+        if cache_path.exists():
+            return json.loads(cache_path.read_text())
+
+    if multipart:
+        with _open_parts(audio=audio_path, image=image_path) as files:
+            data = {"job_id": job_id} if job_id else None
+            resp = _SESSION.post(f"{API_URL}/extract/upload", files=files,
+                                 data=data, timeout=timeout)
+    else:
+        payload = {"audio_b64": _b64(audio_path)}
+        if image_path:
+            payload["image_b64"] = _b64(image_path)
+        if job_id:
+            payload["job_id"] = job_id
+        resp = _SESSION.post(f"{API_URL}/extract", json=payload, timeout=timeout)
 
-    resp = requests.post(f"{API_URL}/extract", json=payload, timeout=timeout)
     if resp.status_code != 200:
         raise RuntimeError(f"API error {resp.status_code}: {resp.text[:300]}")
-    return resp.json()
+    result = _decode(resp)
+    if cache_path is not None and _cacheable(result):
+        _cache_write(cache_path, result)
+    return result
 
 
 def synthesize_report(verified_json: dict, job_id: str | None = None,
@@ -76,26 +188,36 @@ def synthesize_report(verified_json: dict, job_id: str | None = None,
     if job_id:
         payload["job_id"] = job_id
 
-    resp = requests.post(f"{API_URL}/synthesize", json=payload, timeout=timeout)
+    resp = _SESSION.post(f"{API_URL}/synthesize", json=payload, timeout=timeout)
     if resp.status_code != 200:
         raise RuntimeError(f"API error {resp.status_code}: {resp.text[:300]}")
-    return resp.json()
+    return _decode(resp)
 
 
-def transcribe_audio(audio_path: str, timeout: int = 60) -> str:
+def transcribe_audio(audio_path: str, timeout: int = 60,
+                     multipart: bool = True) -> str:
     """Transcribe a field voice note. Returns plain text string."""
-    resp = requests.post(f"{API_URL}/transcribe",
-                         json={"audio_b64": _b64(audio_path)}, timeout=timeout)
+    if multipart:
+        with _open_parts(audio=audio_path) as files:
+            resp = _SESSION.post(f"{API_URL}/transcribe/upload",
+                                 files=files, timeout=timeout)
+    else:
+        resp = _SESSION.post(f"{API_URL}/transcribe",
+                             json={"audio_b64": _b64(audio_path)}, timeout=timeout)
     if resp.status_code != 200:
         raise RuntimeError(f"API error {resp.status_code}: {resp.text[:300]}")
     return resp.json().get("transcript", "")
 
 
+_STATUS_TAGS = {"PASS": "[PASS]", "MONITOR": "[MONITOR]", "FAIL": "[FAIL]"}
+_SEVERITY_TAGS = {"Critical": "[CRIT]", "Moderate": "[MOD]", "Low": "[LOW]"}
+
+
 def pretty_print(result: dict) -> None:
     """Print a human-readable summary to the terminal."""
     s = result.get("inspection_summary", {})
     status = s.get("status", "?").upper()
-    icon = {"PASS": "[PASS]", "MONITOR": "[MONITOR]", "FAIL": "[FAIL]"}.get(status, "[?]")
+    icon = _STATUS_TAGS.get(status, "[?]")
     print(f"\n{'='*55}")
     print(f"  {icon} {status}  --  {s.get('asset', 'CAT D6N Dozer')}")
     print(f"  {s.get('overall_operational_impact', '')}")
@@ -107,7 +229,7 @@ def pretty_print(result: dict) -> None:
         print(f"\n  Anomalies ({len(anomalies)}):")
         for a in anomalies:
             sev = a.get("severity", "?")
-            tag = {"Critical": "[CRIT]", "Moderate": "[MOD]", "Low": "[LOW]"}.get(sev, "[?]")
+            tag = _SEVERITY_TAGS.get(sev, "[?]")
             print(f"    {tag} {a.get('component', '?')} -- {a.get('recommended_action', 'N/A')}")
     else:
         print("  No anomalies.")
@@ -122,6 +244,7 @@ if __name__ == "__main__":
         sys.exit(1)
     result = run_inspection(sys.argv[1],
                             image_path=sys.argv[2] if len(sys.argv) > 2 else None)
+    close()
     pretty_print(result)
     out = sys.argv[1].rsplit(".", 1)[0] + "_report.json"
     with open(out, "w") as f:
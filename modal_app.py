@@ -1,16 +1,40 @@
 import os
 import json
 import base64
-import tempfile
-import urllib.request
-import urllib.error
+import hashlib
+import re
+import io
 import asyncio
+import functools
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 import modal
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(obj) -> bytes:
+    return orjson.dumps(obj) if ORJSON_AVAILABLE else json.dumps(obj).encode("utf-8")
+
+
+def _loads(raw: bytes | str):
+    return orjson.loads(raw) if ORJSON_AVAILABLE else json.loads(raw)
+
+
 app = modal.App("cat-inspect-ai-sprint1")
 vol = modal.Volume.from_name("cat-inspector-outputs", create_if_missing=True)
 
+# Content-addressed results, so reruns of the same samples skip the T4 / Claude
+transcript_cache = modal.Dict.from_name("whisper-cache", create_if_missing=True)
+vision_cache = modal.Dict.from_name("vision-cache", create_if_missing=True)
+note_cache = modal.Dict.from_name("note-cache", create_if_missing=True)
+
 # Shared volume where the fine-tuned LoRA adapter lives (written by pipeline.py)
 # Volume resolves to the workspace where this app is deployed (lanzgaldo for prod)
 adapter_volume = modal.Volume.from_name("d6n-training-vault", create_if_missing=True)
@@ -18,19 +42,58 @@ ADAPTER_PROD      = "/data/adapters/production/v1"
 BASE_MODEL        = "mistralai/Mistral-7B-Instruct-v0.2"
 MODEL_CACHE_DIR   = "/data/models/mistral-7b"
 
-image = modal.Image.debian_slim().apt_install("ffmpeg").pip_install(
-    "openai-whisper", "transformers", "torch", "pillow", "accelerate", "pydantic", "fastapi[standard]"
+image = modal.Image.debian_slim().pip_install(
+    "pillow", "pydantic", "fastapi[standard]", "orjson", "httpx[http2]"
 ).add_local_dir("cat-inspector/schemas", remote_path="/root/schemas"
 ).add_local_dir("cat-inspector/pipeline", remote_path="/root/pipeline"
 ).add_local_dir("cat-inspector/context_engine", remote_path="/root/context_engine"
 ).add_local_dir("cat-inspector/prompts", remote_path="/root/prompts")
 
+# Resolved once per container, and only in containers built from the image
+with image.imports():
+    import httpx
+    from PIL import Image, ImageOps
+
+# Speech-to-text: faster-whisper (CTranslate2) needs the CUDA 12 / cuDNN 9
+# runtime libraries but no PyTorch at inference, and decodes audio through
+# PyAV. Whisper 'small' is converted to INT8 once, at image build, so cold
+# containers just map the quantized weights; CPU-only torch is there for the
+# converter alone.
+WHISPER_DIR = "/models/whisper-small-int8"
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_CHUNK_SECONDS = 30
+WHISPER_BATCH_SIZE = 8      # concurrent transcribe() calls Modal folds into one
+WHISPER_BATCH_WAIT_MS = 50
+WHISPER_MAX_CLIPS = 16      # short clips per encoder/generate pass on a T4
+WHISPER_CUT_SEARCH_SECONDS = 3  # look this far back from a window's end for a pause
+whisper_image = (
+    modal.Image.from_registry("nvidia/cuda:12.4.1-cudnn-runtime-ubuntu22.04", add_python="3.11")
+    .pip_install("faster-whisper", "transformers")
+    .pip_install("torch", index_url="https://download.pytorch.org/whl/cpu")
+    .run_commands(
+        "ct2-transformers-converter --model openai/whisper-small"
+        f" --output_dir {WHISPER_DIR} --quantization int8_float16"
+        " --copy_files tokenizer.json preprocessor_config.json"
+    )
+)
+
+with whisper_image.imports():
+    import numpy as np
+    from faster_whisper import WhisperModel, decode_audio
+    from faster_whisper.audio import pad_or_trim
+    from faster_whisper.tokenizer import Tokenizer
+
 # Heavier image used by the fine-tuned model inference function
 adapter_image = (
     modal.Image.debian_slim(python_version="3.11")
     .pip_install(["torch", "transformers", "peft", "accelerate", "bitsandbytes"])
 )
 
+with adapter_image.imports():
+    import torch
+    from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
+    from peft import PeftModel
+
 D6N_PARTS = {
     "track":         "PT-D6N-TRK-001",
     "blade":         "PT-D6N-BLD-002",
@@ -155,6 +218,149 @@ TARGET SCHEMA TO MATCH EXACTLY:
 }"""
 
 
+@functools.cache
+def _anthropic():
+    """Per-container HTTP/2 client, so warm containers reuse their TLS connection to Anthropic."""
+    return httpx.Client(
+        base_url="https://api.anthropic.com",
+        http2=True,
+        timeout=60,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        headers={"anthropic-version": "2023-06-01", "content-type": "application/json"},
+    )
+
+
+# Stand-in for the base64 image in a serialized request body; see _messages_body
+_IMAGE_SLOT = "__IMAGE_B64__"
+
+
+def _messages_body(data: dict, image: bytes | None = None) -> bytes:
+    """
+    Serialize a streaming Messages request. If image is given, it's
+    base64-encoded straight into the _IMAGE_SLOT position of the body,
+    so the largest blob is never copied into a str or back through the
+    JSON encoder.
+    """
+    body = _dumps({**data, "stream": True})
+    if image is None:
+        return body
+    head, tail = body.split(_IMAGE_SLOT.encode(), 1)
+    return b"".join((head, base64.b64encode(image), tail))
+
+
+def _anthropic_stream(api_key: str, body: bytes) -> tuple[int, str]:
+    """
+    Stream a Messages call and return (status, text). On 200 the text stops
+    at the close of the reply's top-level JSON object, without waiting for
+    any trailing fence or the end of the stream; otherwise it's the error body.
+    """
+    scanner = _JSONObjectScanner()
+    with _anthropic().stream("POST", "/v1/messages", content=body, headers={"x-api-key": api_key}) as response:
+        if response.status_code != 200:
+            response.read()
+            return response.status_code, response.text
+        for line in response.iter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = _loads(line[6:])
+            if event.get("type") == "content_block_delta" and scanner.feed(event["delta"].get("text", "")):
+                break
+    return 200, scanner.text()
+
+
+class _JSONObjectScanner:
+    """Accumulates streamed text and reports when the first top-level {...} closes."""
+
+    def __init__(self):
+        self.parts: list[str] = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, chunk: str) -> bool:
+        for i, ch in enumerate(chunk):
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"' and self.depth:
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}" and self.depth:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.parts.append(chunk[:i + 1])
+                    return True
+        self.parts.append(chunk)
+        return False
+
+    def text(self) -> str:
+        return "".join(self.parts).strip()
+
+
+# The trained Mistral-7B weights live on lanzgaldo's d6n-training-vault
+LANZGALDO_CLASSIFY_URL = "https://lanzgaldo--catrack-provider-web-classify.modal.run"
+
+
+@functools.cache
+def _lanzgaldo():
+    return httpx.Client(http2=True, timeout=90, headers={"content-type": "application/json"})
+
+
+def _classify_transcript(transcript: str) -> dict:
+    """Call lanzgaldo's fine-tuned adapter via HTTPS."""
+    if not (transcript and transcript.strip()):
+        return {"severity": None, "rationale": None, "source": "no_adapter"}
+    try:
+        resp = _lanzgaldo().post(LANZGALDO_CLASSIFY_URL, content=_dumps({"transcript": transcript}))
+        resp.raise_for_status()
+        adapter_classification = _loads(resp.content)
+        print(f"Adapter classification from lanzgaldo: {adapter_classification}")
+        return adapter_classification
+    except Exception as e:
+        print(f"Adapter call to lanzgaldo failed (non-fatal): {e}")
+        return {"severity": None, "rationale": None, "source": "bridge_error"}
+
+
+def _warm_adapter() -> None:
+    """An empty transcript returns straight away but brings the classifier up."""
+    try:
+        _lanzgaldo().post(LANZGALDO_CLASSIFY_URL, content=_dumps({"transcript": ""}))
+    except Exception as e:
+        print(f"Adapter warmup failed (non-fatal): {e}")
+
+
+def _parse_claude_json(text: str):
+    """Parse Claude's reply, minus an optional ```json fence around it."""
+    return _loads(text.strip().removeprefix("```json").removeprefix("```").removesuffix("```"))
+
+
+# Template split around its two slots at import; per request the prompt is
+# a single join of the five pieces
+_DIGESTION_HEAD, _rest = DIGESTION_PROMPT_TEMPLATE.split("{canonical_context}")
+_DIGESTION_MID, _DIGESTION_TAIL = _rest.split("{KNOWN_PARTS}")
+del _rest
+
+_KNOWN_PARTS_JSON = json.dumps(D6N_PARTS)
+_PART_NUMBERS = frozenset(D6N_PARTS.values())
+# One scan over the context for every part name (plurals included)
+_PART_RE = re.compile(
+    r"\b(" + "|".join(map(re.escape, D6N_PARTS)) + r")s?\b", re.IGNORECASE
+)
+
+
+def _known_parts(canonical_context: str) -> str:
+    """Parts named in the context, or the full list when none are."""
+    named = {m.lower() for m in _PART_RE.findall(canonical_context)}
+    if not named:
+        return _KNOWN_PARTS_JSON
+    return json.dumps({k: v for k, v in D6N_PARTS.items() if k in named})
+
+
 # ---------------------------------------------------------------------------
 # FINE-TUNED ADAPTER CLASSIFIER
 # Loads the LoRA adapter trained by pipeline.py from the shared Modal Volume.
@@ -162,21 +368,18 @@ TARGET SCHEMA TO MATCH EXACTLY:
 # fine-tuned Mistral-7B model. This is injected into Claude's prompt as a
 # domain-grounded signal, improving severity accuracy for CAT D6N findings.
 # ---------------------------------------------------------------------------
+# Not on the request path: digest_maintenance_event classifies through
+# lanzgaldo's web_classify (_classify_transcript), where the trained weights
+# live and where the resident classifier is served (catrack_provider.py).
+# Kept for ad-hoc `modal run` use, so it scales from zero.
 @app.function(
     image=adapter_image,
     gpu="A10G",
     timeout=120,
-    min_containers=1,
     volumes={"/data": adapter_volume},
 )
 def classify_with_adapter(transcript: str) -> dict:
-    import os
     import gc
-    import torch
-    import json
-    import re
-    from transformers import AutoModelForCausalLM, AutoTokenizer, BitsAndBytesConfig
-    from peft import PeftModel
 
     # Prevent VRAM fragmentation between sequential calls
     os.environ["PYTORCH_ALLOC_CONF"] = "expandable_segments:True"
@@ -230,8 +433,9 @@ def classify_with_adapter(transcript: str) -> dict:
     # Parse the severity from the model output
     try:
         clean = generated.strip()
-        if clean.count("{") > clean.count("}"):
-            clean += "}" * (clean.count("{") - clean.count("}"))
+        unclosed = clean.count("{") - clean.count("}")
+        if unclosed > 0:
+            clean += "}" * unclosed
         pred = json.loads(clean)
         return {
             "severity": pred.get("severity"),
@@ -250,39 +454,220 @@ def classify_with_adapter(transcript: str) -> dict:
         }
 
 
-@app.function(image=image, gpu="T4", timeout=60, min_containers=1)
-def transcribe_audio(audio_bytes: bytes) -> str:
-    import whisper
-    
-    with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_file:
-        tmp_file.write(audio_bytes)
-        tmp_filename = tmp_file.name
-        
+@app.cls(
+    image=whisper_image,
+    gpu="T4",
+    timeout=120,
+    min_containers=1,
+    scaledown_window=300,
+)
+class Ears:
+    """
+    Whisper, as an INT8 CTranslate2 model, held on the GPU for the container's
+    lifetime. Concurrent transcribe() calls are micro-batched: clips that fit
+    in Whisper's 30 s input share one padded encoder + greedy decode pass
+    instead of one pass per request. Longer recordings are cut into windows
+    at pauses and fanned out across EarsWindow containers.
+    """
+
+    @modal.enter()
+    def load(self):
+        # 'small' >> 'base' for technical vocabulary
+        self.model = WhisperModel(WHISPER_DIR, device="cuda", compute_type="int8_float16")
+        # Technician notes are English; fixing the language keeps the decoder
+        # prompt identical across the batch
+        self.tokenizer = Tokenizer(
+            self.model.hf_tokenizer, self.model.model.is_multilingual,
+            task="transcribe", language="en",
+        )
+        self.prompt = self.model.get_prompt(self.tokenizer, [], without_timestamps=True)
+
+    @modal.batched(max_batch_size=WHISPER_BATCH_SIZE, wait_ms=WHISPER_BATCH_WAIT_MS)
+    def transcribe(self, audio_bytes: list[bytes]) -> list[str]:
+        """
+        Callers pass one clip and get one transcript; Modal does the batching.
+        A clip that fails to decode or transcribe comes back as "" (and isn't
+        cached) without failing the other callers in its batch.
+        """
+        keys = [hashlib.sha256(clip).hexdigest() for clip in audio_bytes]
+        transcripts = [transcript_cache.get(key) for key in keys]
+        pending = [i for i, text in enumerate(transcripts) if text is None]
+
+        window = WHISPER_CHUNK_SECONDS * WHISPER_SAMPLE_RATE
+        short, windows, owners = {}, [], []
+        for i in pending:
+            try:
+                # PyAV decodes from a seekable buffer, so m4a with a trailing
+                # index works without a temp file
+                audio = decode_audio(io.BytesIO(audio_bytes[i]), sampling_rate=WHISPER_SAMPLE_RATE)
+            except Exception as e:
+                print(f"Ears: could not decode clip {keys[i][:12]}: {e}")
+                continue
+            if len(audio) <= window:
+                short[i] = audio
+            else:
+                for piece in _split_at_pauses(audio, window):
+                    windows.append(piece)
+                    owners.append(i)
+
+        # The long-recording fan-out runs in the background while this
+        # container decodes the short clips, so neither waits on the other
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            fanout = pool.submit(_fan_out, windows) if windows else None
+            for i, text in self._transcribe_short(short).items():
+                transcripts[i] = text
+            window_texts = fanout.result() if fanout else []
+
+        pieces, failed = {}, set()
+        for i, text in zip(owners, window_texts):
+            if isinstance(text, BaseException):
+                failed.add(i)
+            elif text:
+                pieces.setdefault(i, []).append(text)
+        for i in dict.fromkeys(owners):
+            if i not in failed:
+                transcripts[i] = " ".join(pieces.get(i, ()))
+
+        for i in pending:
+            if transcripts[i] is None:
+                transcripts[i] = ""
+            else:
+                transcript_cache[keys[i]] = transcripts[i]
+        return transcripts
+
+    def _transcribe_short(self, clips: dict) -> dict:
+        """Greedy-decode clips of up to 30 s, WHISPER_MAX_CLIPS per pass."""
+        texts = {}
+        items = list(clips.items())
+        for start in range(0, len(items), WHISPER_MAX_CLIPS):
+            group = items[start:start + WHISPER_MAX_CLIPS]
+            try:
+                # The encoder input is a fixed 30 s, so every clip pads to the same shape
+                features = np.stack([pad_or_trim(self.model.feature_extractor(audio)) for _, audio in group])
+                results = self.model.model.generate(
+                    self.model.encode(features), [self.prompt] * len(group), beam_size=1,
+                )
+                for (i, _), r in zip(group, results):
+                    texts[i] = self.tokenizer.decode(r.sequences_ids[0]).strip()
+            except Exception as e:
+                # Don't let one bad clip sink the rest of its group
+                print(f"Ears: batched decode failed ({e}); retrying {len(group)} clips one by one")
+                for i, audio in group:
+                    try:
+                        texts[i] = _transcribe_pcm(self.model, audio)
+                    except Exception as e:
+                        print(f"Ears: transcription failed: {e}")
+                        texts[i] = None
+        return texts
+
+
+@app.cls(
+    image=whisper_image,
+    gpu="T4",
+    timeout=120,
+    scaledown_window=300,
+)
+class EarsWindow:
+    """One window of a long recording per call; Ears fans windows out here."""
+
+    @modal.enter()
+    def load(self):
+        self.model = WhisperModel(WHISPER_DIR, device="cuda", compute_type="int8_float16")
+
+    @modal.method()
+    def transcribe_pcm(self, audio) -> str:
+        """Transcribe one window of 16 kHz mono float32 samples."""
+        return _transcribe_pcm(self.model, audio)
+
+
+def _transcribe_pcm(model, audio) -> str:
+    # beam_size=1 is greedy, as openai-whisper was
+    segments, _ = model.transcribe(audio, beam_size=1, language="en")
+    return "".join(segment.text for segment in segments).strip()
+
+
+def _fan_out(windows: list) -> list:
+    """Window texts in order; a failed window comes back as its exception."""
     try:
-        model = whisper.load_model("small")  # 'small' >> 'base' for technical vocabulary
-        result = model.transcribe(tmp_filename)
-        return result["text"].strip()
-    finally:
-        if os.path.exists(tmp_filename):
-            os.remove(tmp_filename)
+        return list(EarsWindow().transcribe_pcm.map(windows, return_exceptions=True))
+    except Exception as e:
+        print(f"Ears: window fan-out failed: {e}")
+        return [e] * len(windows)
+
+
+def _split_at_pauses(audio, window: int) -> list:
+    """
+    Cut audio into pieces of at most `window` samples. Each cut lands on the
+    quietest 100 ms frame in the last WHISPER_CUT_SEARCH_SECONDS of its
+    window, so a word is rarely split across two windows.
+    """
+    frame = WHISPER_SAMPLE_RATE // 10
+    search = WHISPER_CUT_SEARCH_SECONDS * WHISPER_SAMPLE_RATE
+    pieces, start = [], 0
+    while len(audio) - start > window:
+        end = start + window
+        energy = np.square(audio[end - search:end]).reshape(-1, frame).sum(axis=1)
+        cut = end - search + int(np.argmin(energy)) * frame + frame // 2
+        pieces.append(audio[start:cut])
+        start = cut
+    pieces.append(audio[start:])
+    return pieces
+
 
 @app.function(image=image, secrets=[modal.Secret.from_name("anthropic-secret")], timeout=60)
 def analyze_image(image_bytes: bytes, category: str = "auto") -> dict | None:
-    if not image_bytes:
+    if not _looks_like_image(image_bytes):
         return None
-        
-    b64_image = base64.b64encode(image_bytes).decode('utf-8')
-    
+
+    # The segment prompt depends on category, so it's part of the key
+    cache_key = f"{category}:{hashlib.sha256(image_bytes).hexdigest()}"
+    cached = vision_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    vision = _analyze_image(image_bytes, category)
+    if vision is not None:
+        vision_cache[cache_key] = vision
+    return vision
+
+
+# JPEG / PNG signatures; anything else (or a stub) isn't worth a Claude call
+_IMAGE_MAGIC = (b"\xff\xd8\xff", b"\x89PNG")
+_MIN_IMAGE_BYTES = 1024
+
+
+def _looks_like_image(data: bytes | None) -> bool:
+    return bool(data) and len(data) >= _MIN_IMAGE_BYTES and data.startswith(_IMAGE_MAGIC)
+
+
+# Claude resizes anything past ~1568px on the long edge itself, so larger
+# uploads only cost bandwidth and tokens
+VISION_MAX_EDGE = 1568
+EXIF_ORIENTATION = 0x0112
+
+
+def _downscale_for_vision(image_bytes: bytes) -> bytes:
+    """
+    Shrink to VISION_MAX_EDGE and re-encode as JPEG (the media type the
+    request declares). A JPEG that already fits and is stored upright is
+    passed through untouched.
+    """
+    img = Image.open(io.BytesIO(image_bytes))
+    upright = img.getexif().get(EXIF_ORIENTATION, 1) == 1
+    if img.format == "JPEG" and upright and max(img.size) <= VISION_MAX_EDGE:
+        return image_bytes
+    # Re-encoding drops EXIF, so bake the phone's rotation into the pixels first
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE))
+    buf = io.BytesIO()
+    img.convert("RGB").save(buf, "JPEG", quality=85)
+    return buf.getvalue()
+
+
+def _analyze_image(image_bytes: bytes, category: str) -> dict | None:
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY secret not found.")
 
-    headers = {
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
-
     import sys
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
     from context_engine.subsection_router import SubsectionRouter
@@ -338,7 +723,7 @@ Respond in JSON only. No markdown. No preamble. No backticks:
                         "source": {
                             "type": "base64",
                             "media_type": "image/jpeg",
-                            "data": b64_image
+                            "data": _IMAGE_SLOT
                         }
                     },
                     {
@@ -350,26 +735,13 @@ Respond in JSON only. No markdown. No preamble. No backticks:
         ]
     }
 
-    req = urllib.request.Request(
-        "https://api.anthropic.com/v1/messages", 
-        data=json.dumps(data).encode("utf-8"), 
-        headers=headers
-    )
-    
     try:
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            content_text = result["content"][0]["text"].strip()
-            
-            if content_text.startswith("```json"):
-                content_text = content_text[7:]
-            if content_text.startswith("```"):
-                content_text = content_text[3:]
-            if content_text.endswith("```"):
-                content_text = content_text[:-3]
-                
-            return json.loads(content_text.strip())
-            
+        status, content_text = _anthropic_stream(api_key, _messages_body(data, image=_downscale_for_vision(image_bytes)))
+        if status != 200:
+            raise RuntimeError(f"HTTP Error {status}")
+
+        return _parse_claude_json(content_text)
+
     except Exception as e:
         print(f"Error in analyze_image: {e}")
         try:
@@ -379,19 +751,48 @@ Respond in JSON only. No markdown. No preamble. No backticks:
         return None
 
 @app.function(image=image, secrets=[modal.Secret.from_name("anthropic-secret")], timeout=60)
-def extract_structured_note(canonical_context: str) -> dict:
+def extract_structured_note(canonical_context: str | dict) -> dict:
+    """
+    canonical_context is either already-serialized JSON (the fusion layer's
+    model_dump_json) or a plain dict, which is serialized here, once, on the
+    way into the prompt.
+    """
+    if not isinstance(canonical_context, str):
+        canonical_context = _dumps(canonical_context).decode("utf-8")
+
+    cache_key = _note_cache_key(canonical_context)
+    cached = note_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    note = _extract_structured_note(canonical_context)
+    if "error" not in note:
+        note_cache[cache_key] = note
+    return note
+
+
+# Stamped fresh on every run, so they'd make every key unique
+_VOLATILE_CONTEXT_KEYS = ("context_id", "session_id", "created_at")
+
+
+def _note_cache_key(canonical_context: str) -> str:
+    """Hash of the context's transcript / vision / adapter content, minus run ids."""
+    context = _loads(canonical_context)
+    if isinstance(context, dict):
+        for key in _VOLATILE_CONTEXT_KEYS:
+            context.pop(key, None)
+    return hashlib.blake2b(_dumps(context), digest_size=16).hexdigest()
+
+
+def _extract_structured_note(canonical_context: str) -> dict:
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         raise ValueError("ANTHROPIC_API_KEY secret not found.")
 
-    headers = {
-        "x-api-key": api_key,
-        "anthropic-version": "2023-06-01",
-        "content-type": "application/json"
-    }
-    
-    prompt = DIGESTION_PROMPT_TEMPLATE.replace("{canonical_context}", canonical_context)
-    prompt = prompt.replace("{KNOWN_PARTS}", json.dumps(D6N_PARTS))
+    prompt = "".join((
+        _DIGESTION_HEAD, canonical_context,
+        _DIGESTION_MID, _known_parts(canonical_context),
+        _DIGESTION_TAIL,
+    ))
 
     data = {
         "model": "claude-sonnet-4-6",
@@ -405,92 +806,79 @@ def extract_structured_note(canonical_context: str) -> dict:
         ]
     }
 
-    req = urllib.request.Request(
-        "https://api.anthropic.com/v1/messages", 
-        data=json.dumps(data).encode("utf-8"), 
-        headers=headers
-    )
-    
     try:
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            content_text = result["content"][0]["text"].strip()
-            
-            if content_text.startswith("```json"):
-                content_text = content_text[7:]
-            if content_text.startswith("```"):
-                content_text = content_text[3:]
-            if content_text.endswith("```"):
-                content_text = content_text[:-3]
-                
-            return json.loads(content_text.strip())
-            
-    except urllib.error.HTTPError as e:
-        error_body = e.read().decode("utf-8")
-        print(f"HTTPError in extract_structured_note: {e.code} - {error_body}")
-        return {"error": "Failed to extract structured note", "details": f"HTTP Error {e.code}: {error_body}"}
+        status, content_text = _anthropic_stream(api_key, _messages_body(data))
+        if status != 200:
+            print(f"HTTPError in extract_structured_note: {status} - {content_text}")
+            return {"error": "Failed to extract structured note", "details": f"HTTP Error {status}: {content_text}"}
+
+        note = _parse_claude_json(content_text)
+        # Drop part numbers Claude made up rather than took from the lookup
+        for anomaly in note.get("anomalies") or ():
+            if anomaly.get("part_number") not in _PART_NUMBERS:
+                anomaly["part_number"] = None
+        return note
+
     except Exception as e:
         print(f"Error in extract_structured_note: {e}")
         return {"error": "Failed to extract structured note", "details": str(e)}
 
 @app.function(image=image, secrets=[modal.Secret.from_name("anthropic-secret")], volumes={"/outputs": vol}, timeout=180)
-def digest_maintenance_event(audio_bytes: bytes, image_bytes: bytes | None = None, component_category: str = "auto"):
+async def digest_maintenance_event(audio_bytes: bytes, image_bytes: bytes | None = None, component_category: str = "auto"):
     # Input validation
     if not audio_bytes:
         raise ValueError("Audio missing for inference.")
         
-    ears_call = transcribe_audio.spawn(audio_bytes)
+    ears_call = await Ears().transcribe.spawn.aio(audio_bytes)
+    # Wake the adapter and open the connection to it while Whisper runs,
+    # so the classify call below doesn't start cold once the transcript lands
+    threading.Thread(target=_warm_adapter, daemon=True).start()
 
     eyes_call = None
-    if image_bytes is not None and len(image_bytes) > 0:
-        eyes_call = analyze_image.spawn(image_bytes, component_category)
+    if _looks_like_image(image_bytes):
+        eyes_call = await analyze_image.spawn.aio(image_bytes, component_category)
         
-    transcript = ears_call.get()
-    
-    # ── Call lanzgaldo's fine-tuned adapter via HTTPS ──
-    # The trained Mistral-7B weights live on lanzgaldo's d6n-training-vault
-    LANZGALDO_CLASSIFY_URL = "https://lanzgaldo--catrack-provider-web-classify.modal.run"
-    adapter_classification = {"severity": None, "rationale": None, "source": "no_adapter"}
-    if transcript and transcript.strip():
-        try:
-            import urllib.request
-            classify_payload = json.dumps({"transcript": transcript}).encode("utf-8")
-            classify_req = urllib.request.Request(
-                LANZGALDO_CLASSIFY_URL,
-                data=classify_payload,
-                headers={"Content-Type": "application/json"},
-            )
-            with urllib.request.urlopen(classify_req, timeout=90) as resp:
-                adapter_classification = json.loads(resp.read().decode("utf-8"))
-            print(f"Adapter classification from lanzgaldo: {adapter_classification}")
-        except Exception as e:
-            print(f"Adapter call to lanzgaldo failed (non-fatal): {e}")
-            adapter_classification = {"severity": None, "rationale": None, "source": "bridge_error"}
-    
-    vision_raw = None
-    if eyes_call:
-        vision_raw = eyes_call.get()
+    transcript = await ears_call.get.aio()
+
+    # The adapter call and the vision result are independent; wait on both at once
+    adapter_classification, vision_raw = await asyncio.gather(
+        asyncio.to_thread(_classify_transcript, transcript),
+        eyes_call.get.aio() if eyes_call else asyncio.sleep(0, result=None),
+    )
         
-    import asyncio
     import sys
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
     from pipeline.context_bucket import build_context_bucket, write_context_json
     
-    context = asyncio.run(build_context_bucket(
+    context = await build_context_bucket(
         raw_transcript=transcript,
         raw_vision=vision_raw,
         raw_adapter=adapter_classification,
         adapter_version="v1",
         component_category=component_category,
         inspection_type="daily_walkaround"
-    ))
+    )
     
     context_path = write_context_json(context, output_dir="/outputs")
-    final_output = extract_structured_note.remote(context.model_dump_json())
+    # Same image and secret as this container, so run it here rather than
+    # paying a second container hop (and possibly its cold start)
+    final_output = await asyncio.to_thread(extract_structured_note.local, context.model_dump_json())
     
+    # Stages that fell back to an empty or error result; callers use this
+    # to avoid caching a run that should be retried
+    degraded = [
+        stage for stage, failed in (
+            ("transcript", not transcript.strip()),
+            ("adapter", str(adapter_classification.get("source", "")).endswith("_error")),
+            ("vision", eyes_call is not None and vision_raw is None),
+            ("note", "error" in final_output),
+        ) if failed
+    ]
+
     return {
         "context_path": context_path,
-        "inspection_output": final_output
+        "inspection_output": final_output,
+        "degraded": degraded,
     }
 
 @app.local_entrypoint()
@@ -530,7 +918,7 @@ def main(audio_path: str | None = None, image_path: str | None = None, category:
 
 
 @app.local_entrypoint()
-def batch(audio_dir: str = "./audiotestcases", output: str = "./audiotestcases_results.json"):
+async def batch(audio_dir: str = "./audiotestcases", output: str = "./audiotestcases_results.json"):
     """
     Process all MP3s in audio_dir through the full pipeline.
     Usage: modal run modal_app.py::batch
@@ -542,41 +930,55 @@ def batch(audio_dir: str = "./audiotestcases", output: str = "./audiotestcases_r
     ])
     print(f"Found {len(mp3_files)} audio files in {audio_dir}\n")
 
-    results = []
-    for i, filename in enumerate(mp3_files):
-        filepath = os.path.join(audio_dir, filename)
-        print(f"[{i+1}/{len(mp3_files)}] {filename}")
-        with open(filepath, "rb") as f:
-            audio_bytes = f.read()
+    # At most 16 calls in flight; awaiting them on one event loop lets the
+    # wall clock track Modal's fan-out rather than N x per-file latency.
+    in_flight = asyncio.Semaphore(16)
+
+    async def process(i: int, filename: str) -> dict:
         try:
-            result = digest_maintenance_event.remote(audio_bytes, None)
-            result["_file"] = filename
-            result["_index"] = i + 1
-            results.append(result)
-
-            summary     = result.get("inspection_summary", {})
-            status      = summary.get("status", "?").upper()
-            adapter_sev = (result.get("adapter_classification") or {}).get("severity", "N/A")
-            anomalies   = len(result.get("anomalies", []))
-            transcript  = result.get("raw_transcript", "")[:75]
-            print(f"  Status: {status:<8} Adapter: {adapter_sev:<5} Anomalies: {anomalies}  \"{transcript}\"")
+            async with in_flight:
+                with open(os.path.join(audio_dir, filename), "rb") as f:
+                    audio_bytes = f.read()
+                result = await digest_maintenance_event.remote.aio(audio_bytes, None)
         except Exception as e:
-            print(f"  ERROR: {e}")
-            results.append({"_file": filename, "_index": i + 1, "error": str(e)})
+            return {"_file": filename, "_index": i + 1, "error": str(e)}
+        result["_file"] = filename
+        result["_index"] = i + 1
+        return result
 
-    with open(output, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    results = []
+    counts = Counter()
+    pending = [process(i, name) for i, name in enumerate(mp3_files)]
+    for done, next_result in enumerate(asyncio.as_completed(pending), 1):
+        result = await next_result
+        results.append(result)
+        print(f"[{done}/{len(mp3_files)}] {result['_file']}")
+        if "error" in result:
+            counts["error"] += 1
+            print(f"  ERROR: {result['error']}")
+            continue
+
+        summary     = result.get("inspection_summary", {})
+        counts[summary.get("status")] += 1
+        status      = summary.get("status", "?").upper()
+        adapter_sev = (result.get("adapter_classification") or {}).get("severity", "N/A")
+        anomalies   = len(result.get("anomalies", []))
+        transcript  = result.get("raw_transcript", "")[:75]
+        print(f"  Status: {status:<8} Adapter: {adapter_sev:<5} Anomalies: {anomalies}  \"{transcript}\"")
+    results.sort(key=lambda r: r["_index"])
+
+    with open(output, "wb") as f:
+        if ORJSON_AVAILABLE:
+            f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+        else:
+            f.write(json.dumps(results, indent=2, ensure_ascii=False).encode("utf-8"))
 
     print(f"\n{'='*60}")
     print(f"Complete. {len(results)} results → {output}")
     print(f"{'='*60}\n")
 
     # Summary table
-    pass_count    = sum(1 for r in results if r.get("inspection_summary", {}).get("status") == "pass")
-    monitor_count = sum(1 for r in results if r.get("inspection_summary", {}).get("status") == "monitor")
-    fail_count    = sum(1 for r in results if r.get("inspection_summary", {}).get("status") == "fail")
-    error_count   = sum(1 for r in results if "error" in r)
-    print(f"PASS: {pass_count}  MONITOR: {monitor_count}  FAIL: {fail_count}  ERROR: {error_count}")
+    print(f"PASS: {counts['pass']}  MONITOR: {counts['monitor']}  FAIL: {counts['fail']}  ERROR: {counts['error']}")
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -593,7 +995,7 @@ def web_transcribe(item: dict):
     if not audio_b64:
         return {"error": "audio_b64 is required"}
     audio_bytes = base64.b64decode(audio_b64)
-    transcript = transcribe_audio.remote(audio_bytes)
+    transcript = Ears().transcribe.remote(audio_bytes)
     return {"transcript": transcript}
 
 
@@ -645,7 +1047,7 @@ def web_synthesize(item: dict):
     verified = item.get("verified_json", {})
     if not verified:
         return {"error": "verified_json is required"}
-    report = extract_structured_note.remote(json.dumps(verified))
+    report = extract_structured_note.remote(verified)
     return {"report": report}
 
 